@@ -4,6 +4,7 @@ import plotly.graph_objects as go
 from PIL import Image
 
 from backend.calculator import *
+from backend.incremental import resume_phaseout, resume_total_wealth
 
 
 # Branding colours
@@ -37,6 +38,8 @@ P0 = st.number_input("Baseline Premium (Phase-Out) (NZD)", value=1_800.0, step=5
 g = st.number_input("Annual Premium Escalation Rate (%)", value=3.0, step=0.1) / 100.0
 
 r_avg = st.number_input("Annual Rate on Investment (%)", value=5.011, step=0.01) / 100.0
+COMPOUNDING = {"Annual": None, "Monthly": 12, "Fortnightly": 26, "Weekly": 52}
+periods = COMPOUNDING[st.selectbox("KiwiSaver Compounding", list(COMPOUNDING))]
 K0 = st.number_input("KiwiSaver Start Balance (NZD)", value=100_000.0, step=1_000.0, format="%f")
 
 Salary = st.number_input("Annual Salary (NZD)", value=80_000.0, step=1_000.0, format="%f")
@@ -73,12 +76,47 @@ if num_kids > 0:
 
 S0 = Salary * percentage
 
+
+# ---------- Memoised model runs ----------
+# Each model is cached on its own inputs only, so e.g. changing the funeral cost reruns the
+# total-wealth model but serves both phase-out runs from cache. On a miss the model resumes from
+# this session's previous run at the first year the change affects (see backend/incremental.py).
+def resume_last_run(key, inputs, project, resume):
+    previous = st.session_state.get(key)
+    if previous is None:
+        result = project(**inputs)
+    else:
+        result = resume(previous[1], previous[0], **inputs)
+    st.session_state[key] = (inputs, result)
+    return result
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def run_phaseout(max_t, L, P0, g, r_avg, K0, si, S0, alpha, periods=None):
+    inputs = dict(max_t=max_t, L=L, P0=P0, g=g, r_avg=r_avg, K0=K0, si=si, S0=S0, alpha=alpha, periods=periods)
+    result = resume_last_run(f"phaseout_{alpha}", inputs, project_phaseout, resume_phaseout)
+    return result.to_dataframe(), result.full_cover_t
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def run_total_wealth(max_t, P0, g, r_avg, K0, si, S0, property_value, cash, managed_funds, other_assets,
+                     liabilities, child_ages, asset_growth_rate, debt_shrink_rate, holding_amount, funeral_cost,
+                     periods=None):
+    inputs = dict(max_t=max_t, P0=P0, g=g, r_avg=r_avg, K0=K0, si=si, S0=S0, property_value=property_value,
+                  cash=cash, managed_funds=managed_funds, other_assets=other_assets, liabilities=liabilities,
+                  child_ages=list(child_ages), asset_growth_rate=asset_growth_rate,
+                  debt_shrink_rate=debt_shrink_rate, holding_amount=holding_amount, funeral_cost=funeral_cost,
+                  periods=periods)
+    result = resume_last_run("total_wealth", inputs, project_total_wealth, resume_total_wealth)
+    return result.to_dataframe(), result.full_cover_t
+
+
 # ---------- Run button ----------
 if st.button("Run Projection"):
     max_t = int(stop_age - current_age)
 
     # Phase-Out (with offset) and no-offset baseline for comparison (phase-out P0)
-    df_phase, full_cover_t_phase = calculator_phaseout(
+    df_phase, full_cover_t_phase = run_phaseout(
         max_t=max_t,
         L=L,
         P0=P0,
@@ -87,10 +125,11 @@ if st.button("Run Projection"):
         K0=K0,
         si=si,
         S0=S0,
-        alpha=1.0
+        alpha=1.0,
+        periods=periods
     )
 
-    df_no_offset, _ = calculator_phaseout(
+    df_no_offset, _ = run_phaseout(
         max_t=max_t,
         L=L,
         P0=P0,
@@ -99,7 +138,8 @@ if st.button("Run Projection"):
         K0=K0,
         si=si,
         S0=S0,
-        alpha=0.0
+        alpha=0.0,
+        periods=periods
     )
 
     # ---------- Compute initial Premium ----------
@@ -110,7 +150,7 @@ if st.button("Run Projection"):
     baseline_premium = P0 * (required_cover_prev / L)
 
     # ---------- Total-Wealth model ----------
-    df_total, full_cover_t_total = calculator_total_wealth(
+    df_total, full_cover_t_total = run_total_wealth(
         max_t=int(stop_age - current_age),
         P0=baseline_premium,
         g=g,
@@ -123,11 +163,12 @@ if st.button("Run Projection"):
         managed_funds=managed_funds,
         other_assets=other_assets,
         liabilities=liabilities,
-        child_ages=child_ages,
+        child_ages=tuple(child_ages),
         asset_growth_rate=asset_growth_rate,
         debt_shrink_rate=debt_shrink_rate,
         holding_amount=holding_amount,
-        funeral_cost=funeral_cost
+        funeral_cost=funeral_cost,
+        periods=periods
     )
 
     # ---------- Success message restored ----------
@@ -1,10 +1,89 @@
-from fastapi import FastAPI
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from fastapi import FastAPI, HTTPException, Path, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from backend.models import ProjectionRequest
-from backend.calculator import calculator_phaseout
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from backend.models import HouseholdRequest, MonteCarloRequest, ProjectionRequest, SolveRequest, TotalWealthRequest
+from backend.core import (
+    initial_required_cover,
+    iter_phaseout_rows,
+    iter_total_wealth_rows,
+    period_detail,
+    project_total_wealth,
+)
+from backend.projection import (
+    INVESTMENT_RETURNS,
+    INVESTMENT_VOLATILITIES,
+    phaseout_inputs,
+    summarise_many,
+    summarise_projection,
+    total_wealth_inputs,
+)
+from backend.result import ProjectionResult
+from backend.montecarlo import simulate_phaseout
+from backend.household import project_household
+from backend import export
+from backend.solver import solve_phaseout
+from backend.cache import ProjectionCache, SharedCache, request_key
+from backend.jobs import JobManager
+from backend.precompute import PrecomputedGrid
+from backend import instrumentation
+from backend.instrumentation import instrumented, span
 from backend.constants import *
 
-app = FastAPI()
+# Background re-projections (/jobs); see backend/jobs.py
+job_manager = JobManager()
+
+# Production mode (see backend/serve.py): CPU-bound handlers run in a pool of API_POOL_WORKERS
+# processes instead of the threadpool, so they don't queue behind the GIL. 0 keeps them in-process.
+API_POOL_WORKERS = int(os.environ.get("API_POOL_WORKERS", 0))
+cpu_pool: Optional[ProcessPoolExecutor] = None
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """
+    Run fn in the process pool in production mode, or in the threadpool otherwise. A request sent
+    with X-Profile runs fn in the threadpool under its profiler, which can't follow it into the pool.
+    """
+    profiled_fn = instrumentation.profiled(fn)
+    if cpu_pool is None or profiled_fn is not fn:
+        return await run_in_threadpool(profiled_fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(cpu_pool, functools.partial(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global cpu_pool
+    if API_POOL_WORKERS > 0:
+        cpu_pool = ProcessPoolExecutor(API_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        # Start the workers and import the models now rather than on the first requests
+        await asyncio.gather(*(run_cpu(summarise_many, []) for _ in range(API_POOL_WORKERS)))
+    if PROJECTION_WARMUP_PATH:
+        warm_requests = load_warmup(PROJECTION_WARMUP_PATH)
+        await run_in_threadpool(projection_cache.warm, [
+            (request_key(req), functools.partial(lookup_or_summarise, req)) for req in warm_requests
+        ])
+    job_manager.start()
+    yield
+    job_manager.shutdown()
+    if cpu_pool is not None:
+        cpu_pool.shutdown(cancel_futures=True)
+        cpu_pool = None
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,71 +93,390 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-stage timings (Server-Timing header, /metrics); see backend/instrumentation.py
+if instrumentation.ENABLED:
+    app.middleware("http")(instrumentation.timing_middleware)
+
+_batch_adapter = TypeAdapter(List[ProjectionRequest])
+
+# Optional precomputed grid (python -m backend.precompute); PRECOMPUTED_MAX_ERROR is the relative
+# interpolation error accepted before /calculate falls back to the live model
+precomputed_grid = (
+    PrecomputedGrid(os.environ["PRECOMPUTED_GRID_PATH"], max_error=float(os.environ.get("PRECOMPUTED_MAX_ERROR", 1e-3)))
+    if os.environ.get("PRECOMPUTED_GRID_PATH") else None
+)
+
+# Response cache for /calculate. PROJECTION_CACHE_SIZE=0 turns it off, PROJECTION_CACHE_TTL=0 means no expiry.
+# PROJECTION_SHARED_CACHE=<sqlite path> adds an on-disk second tier shared by all workers on the host and kept
+# across restarts (entries are versioned by constants and code, so they don't expire unless
+# PROJECTION_SHARED_CACHE_TTL is set). PROJECTION_WARMUP_PATH=<json list or ndjson of requests> loads those
+# inputs into the cache at startup. Results served from a precomputed grid are stored under that grid's identity,
+# so they are never reused without it.
+projection_cache = ProjectionCache(
+    maxsize=int(os.environ.get("PROJECTION_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("PROJECTION_CACHE_TTL", 3600)) or None,
+    shared=SharedCache(
+        os.environ["PROJECTION_SHARED_CACHE"],
+        maxsize=int(os.environ.get("PROJECTION_SHARED_CACHE_SIZE", 100_000)),
+        ttl=float(os.environ.get("PROJECTION_SHARED_CACHE_TTL", 0)) or None,
+        # Grid answers are approximations, only valid for the same grid and PRECOMPUTED_MAX_ERROR
+        variant=f"grid-{precomputed_grid.identity}" if precomputed_grid is not None else "",
+    ) if os.environ.get("PROJECTION_SHARED_CACHE") else None,
+)
+PROJECTION_WARMUP_PATH = os.environ.get("PROJECTION_WARMUP_PATH")
+
+
+def load_warmup(path: str) -> List[ProjectionRequest]:
+    """Hot /calculate inputs to warm the cache with: a JSON list of requests, or NDJSON."""
+    with open(path) as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return _batch_adapter.validate_json(text)
+    return [ProjectionRequest.model_validate_json(line) for line in text.splitlines() if line.strip()]
+
+
+def lookup_or_summarise(req: ProjectionRequest) -> dict:
+    if precomputed_grid is not None:
+        result = precomputed_grid.lookup(req)
+        if result is not None:
+            return result
+    return summarise_projection(req)
+
+
 @app.post("/calculate")
+@instrumented
 def calculate_projection(req: ProjectionRequest):
+    with span("calculator"):
+        result = projection_cache.get_or_compute(request_key(req), lambda: lookup_or_summarise(req))
+    with span("serialize"):
+        return JSONResponse(result)
 
-    max_t = STOP_AGE - req.current_age
-    S0 = req.salary * req.kiwisaver_rate
-
-    # ------------------------
-    # Select investment return based on option
-    # ------------------------
-    investment_map = {
-        "growth": GROWTH_INVESTMENT_RETURN,
-        "balanced": BALANCED_INVESTMENT_RETURN,
-        "conservative": CONSERVATIVE_INVESTMENT_RETURN,
-    }
 
-    selected_return = investment_map.get(req.investment_type.lower())
-
-    # ------------------------
-    # Run OFFSET scenario
-    # ------------------------
-    df_offset, _ = calculator_phaseout(
-        max_t=max_t,
-        L=req.life_cover,
-        P0=req.premium,
-        g=PREMIUM_ESCALATION,
-        r_avg=selected_return,
-        K0=req.kiwisaver_balance,
-        si=SALARY_INCREASE,
-        S0=S0,
-        alpha=OFFSET_ALPHA
-    )
+@app.post("/calculate/montecarlo")
+@instrumented
+async def calculate_montecarlo(req: MonteCarloRequest):
+    """
+    Stochastic-returns version of the phase-out projection. Mean and volatility default to the
+    investment type's constants; pass a seed for reproducible paths.
+    """
+    investment_type = req.investment_type.lower()
+    mean = req.mean_return if req.mean_return is not None else INVESTMENT_RETURNS.get(investment_type)
+    volatility = req.volatility if req.volatility is not None else INVESTMENT_VOLATILITIES.get(investment_type)
 
-    # ------------------------
-    # Run NO-OFFSET scenario
-    # ------------------------
-    df_no_offset, _ = calculator_phaseout(
-        max_t=max_t,
-        L=req.life_cover,
-        P0=req.premium,
-        g=PREMIUM_ESCALATION,
-        r_avg=selected_return,
-        K0=req.kiwisaver_balance,
-        si=SALARY_INCREASE,
-        S0=S0,
-        alpha=NO_OFFSET_ALPHA
+    with span("calculator"):
+        result = await run_cpu(
+            simulate_phaseout,
+            max_t=STOP_AGE - req.current_age,
+            L=req.life_cover,
+            P0=req.premium,
+            g=PREMIUM_ESCALATION,
+            K0=req.kiwisaver_balance,
+            si=SALARY_INCREASE,
+            S0=req.salary * req.kiwisaver_rate,
+            mean=mean,
+            volatility=volatility,
+            alpha=OFFSET_ALPHA,
+            n_paths=req.n_paths,
+            seed=req.seed
+        )
+    result["age"] = [req.current_age + year for year in result["year"]]
+    result["investment_type"] = req.investment_type
+    with span("serialize"):
+        return Response(content=json.dumps(result), media_type="application/json")
+
+
+def columnar(result: ProjectionResult, float32: bool = False) -> dict:
+    """
+    Table as one array per column. With float32, values are rounded to float32 precision and
+    written with the shortest repr that round-trips at that precision.
+    """
+    data = {}
+    for name, values in result.to_dict().items():
+        if name == "year":
+            data[name] = values.astype(np.int64).tolist()
+        elif float32:
+            data[name] = [float(str(v)) for v in values.astype(np.float32)]
+        else:
+            data[name] = values.tolist()
+    return data
+
+
+@app.post("/calculate/total-wealth")
+@instrumented
+async def calculate_total_wealth(req: TotalWealthRequest):
+    """
+    Total-wealth projection as a compact columnar table: {"columns": [...], "data": {column: [...]}}.
+    The baseline premium is scaled to today's required cover, as in the Streamlit app. With
+    periods, rows stay annual and period_columns/period_data hold the per-period breakdown.
+    """
+    inputs, required_cover = total_wealth_inputs(req)
+    with span("calculator"):
+        result = await run_cpu(project_total_wealth, **inputs)
+        full_cover_t = result.full_cover_t
+
+    with span("serialize"):
+        payload = {
+            "starting_required_cover": round(required_cover, 2),
+            "baseline_premium": round(inputs["P0"], 2),
+            "full_cover_t": full_cover_t,
+            "full_cover_age": req.current_age + full_cover_t if full_cover_t is not None else None,
+            "investment_type": req.investment_type,
+            "columns": result.columns,
+            "data": columnar(result, req.float32),
+        }
+        if req.periods is not None:
+            detail = period_detail(result, inputs["r_avg"], req.periods)
+            payload["periods"] = req.periods
+            payload["period_columns"] = detail.columns
+            payload["period_data"] = columnar(detail, req.float32)
+        return Response(content=json.dumps(payload, separators=(",", ":")), media_type="application/json")
+
+
+@app.post("/calculate/household")
+@instrumented
+async def calculate_household(req: HouseholdRequest):
+    """
+    Joint total-wealth projection for a couple or family: each member's KiwiSaver, salary and policy,
+    with the assets, debts and children shared. Required cover is the household's, and each
+    member's baseline premium is scaled to it. Returns the household table (same columns as
+    /calculate/total-wealth, summed over members) and one table per member.
+    """
+    required_cover = initial_required_cover(
+        K0=sum(member.kiwisaver_balance for member in req.members),
+        property_value=req.property_value,
+        cash=req.cash,
+        managed_funds=req.managed_funds,
+        other_assets=req.other_assets,
+        liabilities=req.liabilities,
+        child_ages=req.child_ages,
+        holding_amount=req.holding_amount,
+        funeral_cost=req.funeral_cost
     )
+    baseline_premiums = [
+        member.premium * (required_cover / member.life_cover) if member.life_cover > 0 else member.premium
+        for member in req.members
+    ]
+
+    with span("calculator"):
+        result = await run_cpu(
+            project_household,
+            max_t=[STOP_AGE - member.current_age for member in req.members],
+            P0=baseline_premiums,
+            g=PREMIUM_ESCALATION,
+            r_avg=[INVESTMENT_RETURNS.get(member.investment_type.lower()) for member in req.members],
+            K0=[member.kiwisaver_balance for member in req.members],
+            si=SALARY_INCREASE,
+            S0=[member.salary * member.kiwisaver_rate for member in req.members],
+            property_value=req.property_value,
+            cash=req.cash,
+            managed_funds=req.managed_funds,
+            other_assets=req.other_assets,
+            liabilities=req.liabilities,
+            child_ages=req.child_ages,
+            asset_growth_rate=req.asset_growth_rate,
+            debt_shrink_rate=req.debt_shrink_rate,
+            holding_amount=req.holding_amount,
+            funeral_cost=req.funeral_cost
+        )
+        full_cover_t = result.household.full_cover_t
 
-    # ------------------------
-    # Calculate summary stats
-    # ------------------------
-    total_premium_with_offset = df_offset["Premium w/ Offset"].sum()
-    total_premium_without_offset = df_no_offset["Baseline Premium"].sum()
-    total_savings = total_premium_without_offset - total_premium_with_offset
+    with span("serialize"):
+        payload = {
+            "starting_required_cover": round(required_cover, 2),
+            "full_cover_t": full_cover_t,
+            "columns": result.household.columns,
+            "data": columnar(result.household, req.float32),
+            "members": [
+                {
+                    "current_age": member.current_age,
+                    "investment_type": member.investment_type,
+                    "baseline_premium": round(premium, 2),
+                    "full_cover_age": member.current_age + full_cover_t if full_cover_t is not None else None,
+                    "columns": table.columns,
+                    "data": columnar(table, req.float32),
+                }
+                for member, premium, table in zip(req.members, baseline_premiums, result.members)
+            ],
+        }
+        return Response(content=json.dumps(payload, separators=(",", ":")), media_type="application/json")
 
-    ks_end_with_offset = df_offset["KiwiSaver End Balance"].iloc[-1]
-    ks_end_without_offset = df_no_offset["KiwiSaver End Balance"].iloc[-1]
 
-    total_ks_increase = ks_end_with_offset - ks_end_without_offset
-    ks_increase_pct = ((total_ks_increase / ks_end_without_offset) * 100) if ks_end_without_offset > 0 else 0
-    per_year_true_cost = total_ks_increase / max(1, STOP_AGE - req.current_age)
+def stream_rows(rows, fmt: str) -> StreamingResponse:
+    """Stream projection rows as NDJSON, or as Server-Sent Events followed by an "end" event."""
+    if fmt == "sse":
+        def events():
+            for row in rows:
+                yield f"data: {json.dumps(row)}\n\n"
+            yield "event: end\ndata: {}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
+
+
+@app.post("/calculate/stream")
+def calculate_stream(req: ProjectionRequest,
+                     scenario: str = Query("offset", pattern="^(offset|no_offset)$"),
+                     format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    """Phase-out rows for one scenario, streamed year by year as they are computed."""
+    rows = iter_phaseout_rows(**phaseout_inputs(req, OFFSET_ALPHA if scenario == "offset" else NO_OFFSET_ALPHA))
+    return stream_rows(rows, format)
+
+
+@app.post("/calculate/total-wealth/stream")
+def calculate_total_wealth_stream(req: TotalWealthRequest,
+                                  format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    """Total-wealth rows streamed year by year as they are computed."""
+    inputs, _ = total_wealth_inputs(req)
+    return stream_rows(iter_total_wealth_rows(**inputs), format)
+
+
+@app.post("/solve")
+@instrumented
+async def solve(req: SolveRequest):
+    """
+    Inverse projection: the smallest kiwisaver_rate, kiwisaver_balance or premium that makes cover
+    unnecessary by target_age, or gives target_balance at STOP_AGE (offset scenario).
+    The request's own value for the solved field is ignored.
+    """
+    max_t = STOP_AGE - req.current_age
+    with span("calculator"):
+        result = await run_cpu(
+            solve_phaseout,
+            solve_for=req.solve_for,
+            max_t=max_t,
+            L=req.life_cover,
+            P0=req.premium,
+            g=PREMIUM_ESCALATION,
+            r_avg=INVESTMENT_RETURNS.get(req.investment_type.lower()),
+            K0=req.kiwisaver_balance,
+            si=SALARY_INCREASE,
+            salary=req.salary,
+            kiwisaver_rate=req.kiwisaver_rate,
+            alpha=OFFSET_ALPHA,
+            target_t=req.target_age - req.current_age if req.target_age is not None else None,
+            target_balance=req.target_balance
+        )
 
     return {
-        "total_savings": max(0, round(total_savings, 2)),
-        "kiwisaver_increase": max(0, round(total_ks_increase, 2)),
-        "kiwisaver_increase_pct": round(ks_increase_pct, 2),
-        "true_cost_per_year": max(0, round(per_year_true_cost, 2)),
-        "investment_type": req.investment_type,
-    }
\ No newline at end of file
+        "solve_for": req.solve_for,
+        "feasible": result.feasible,
+        "value": result.value,
+        "evaluations": result.evaluations,
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text format latency histograms (empty unless API_INSTRUMENTATION=1)."""
+    return PlainTextResponse(instrumentation.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    stats = projection_cache.stats()
+    if precomputed_grid is not None:
+        stats["precomputed"] = precomputed_grid.stats()
+    return stats
+
+
+async def read_batch(request: Request, adapter: TypeAdapter = _batch_adapter) -> Tuple[list, bool]:
+    """
+    Parse and validate a JSON list of ProjectionRequests (or of adapter's type), or NDJSON (one
+    request per line) when sent as application/x-ndjson. Returns (requests, whether the body was NDJSON).
+    """
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+
+    with span("parse"):
+        body = await request.body()
+        try:
+            if ndjson:
+                raw = [json.loads(line) for line in body.splitlines() if line.strip()]
+            else:
+                raw = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": str(e), "input": None}])
+
+    with span("validate_batch"):
+        try:
+            reqs = adapter.validate_python(raw)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+
+    return reqs, ndjson
+
+
+@app.post("/calculate/batch")
+@instrumented
+async def calculate_batch(request: Request):
+    """
+    Bulk version of /calculate for re-projecting a whole client book in one round trip.
+    Summaries come back in input order, in the same format as the body (JSON list or NDJSON).
+    """
+    reqs, ndjson = await read_batch(request)
+
+    with span("calculator"):
+        # One chunk per pool process (a single threadpool call outside production mode)
+        size = max(1, -(-len(reqs) // max(1, API_POOL_WORKERS)))
+        chunks = await asyncio.gather(*(run_cpu(summarise_many, reqs[i:i + size]) for i in range(0, len(reqs), size)))
+        summaries = [summary for chunk in chunks for summary in chunk]
+
+    # Serialise directly, skipping FastAPI's jsonable_encoder pass over every summary
+    with span("serialize"):
+        if ndjson:
+            content = "\n".join(json.dumps(s) for s in summaries) + "\n"
+            return Response(content=content, media_type="application/x-ndjson")
+        return Response(content=json.dumps(summaries), media_type="application/json")
+
+
+_export_adapters = {model: TypeAdapter(List[request_model]) for model, (request_model, _) in export.MODELS.items()}
+
+
+@app.post("/export/{model}")
+async def export_tables(request: Request,
+                        model: str = Path(pattern="^(phaseout|total-wealth)$"),
+                        format: Optional[str] = Query(None, pattern="^(arrow|parquet|csv)$"),
+                        scenario: str = Query("offset", pattern="^(offset|no_offset)$")):
+    """
+    Full year-by-year tables for a batch of clients (same body as /calculate/batch, or
+    /calculate/total-wealth bodies for that model), streamed as one table in chunks of
+    EXPORT_CHUNK_SIZE clients. Arrow IPC file by default, or CSV when pyarrow isn't installed;
+    the schema is fixed per model (see backend/export.py).
+    """
+    fmt = format or ("arrow" if export.HAS_PYARROW else "csv")
+    if fmt != "csv" and not export.HAS_PYARROW:
+        raise HTTPException(status_code=501, detail=f"{fmt} export needs pyarrow; use format=csv")
+    reqs, _ = await read_batch(request, _export_adapters[model])
+
+    chunks = export.stream_export(model, export.project_requests(model, reqs, scenario), fmt)
+    return StreamingResponse(chunks, media_type=export.MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{model}.{fmt}"'})
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request):
+    """
+    Queue a batch for background processing instead of holding the connection open.
+    Same body as /calculate/batch; requests are validated now, so a job only fails on a server error.
+    """
+    reqs, _ = await read_batch(request)
+    job_id = job_manager.submit([req.model_dump() for req in reqs])
+    return {"job_id": job_id, "status": "queued", "total": len(reqs)}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_manager.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """Summaries in input order as NDJSON, once the job is done."""
+    job = job_manager.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return StreamingResponse(job_manager.results(job_id), media_type="application/x-ndjson")
@@ -0,0 +1,227 @@
+import hashlib
+import importlib.util
+import json
+import sqlite3
+import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+
+import backend.constants as constants
+
+
+def constants_digest() -> str:
+    """Stable hash of every public value in backend/constants.py, so persisted results never outlive them."""
+    items = sorted((name, value) for name, value in vars(constants).items() if name.isupper())
+    return hashlib.sha256(repr(items).encode()).hexdigest()[:16]
+
+
+# Modules whose code decides a /calculate summary; editing any of them changes the cache version
+VERSIONED_MODULES = ("backend.constants", "backend.core", "backend.projection", "backend.precompute")
+
+
+@lru_cache(maxsize=None)
+def code_digest() -> str:
+    """Stable hash of the source of VERSIONED_MODULES, read from disk (without importing them)."""
+    digest = hashlib.sha256()
+    for name in VERSIONED_MODULES:
+        with open(importlib.util.find_spec(name).origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_version() -> str:
+    """Version of persisted results: current constants values plus calculator code."""
+    return f"{constants_digest()}-{code_digest()}"
+
+
+def fingerprint(key: Hashable, version: str) -> str:
+    """Stable hash of a normalised cache key (e.g. request_key) under a cache version."""
+    return hashlib.sha256(json.dumps([version, key]).encode()).hexdigest()
+
+
+def request_key(req) -> tuple:
+    """Canonical cache key for a ProjectionRequest (int/float, -0.0 and investment type spelling normalised)."""
+    return (
+        int(req.current_age),
+        float(req.life_cover) + 0.0,
+        float(req.premium) + 0.0,
+        float(req.kiwisaver_balance) + 0.0,
+        float(req.salary) + 0.0,
+        float(req.kiwisaver_rate) + 0.0,
+        req.investment_type.strip().lower(),
+    )
+
+
+class SharedCache:
+    """
+    SQLite-backed cache for JSON-serialisable responses, shared by every worker process on the
+    host (WAL mode, so readers don't block each other) and kept across restarts. Rows are keyed
+    by fingerprint(key, version), where the version (cache_version plus variant) is taken when the
+    cache is opened, so entries from other constants, calculator code or variant are never hit;
+    they are dropped when a process with a different version opens the file. variant must
+    identify any other setting that changes the cached values, e.g. the precomputed grid and
+    error tolerance behind /calculate. Size is bounded approximately: the oldest entries are
+    trimmed every `trim_every` writes.
+    """
+
+    def __init__(self, path: str, maxsize: int = 100_000, ttl: Optional[float] = None, trim_every: int = 64,
+                 variant: str = ""):
+        self.path = path
+        self.variant = variant
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.trim_every = trim_every
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.version = f"{cache_version()}-{variant}" if variant else cache_version()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                       "created REAL NOT NULL, expires REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            stored = db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if stored is None or stored[0] != self.version:
+                db.execute("DELETE FROM cache")
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)", (fingerprint(key, self.version), time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: Hashable, value: Any):
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                       (fingerprint(key, self.version), json.dumps(value), now, now + self.ttl if self.ttl else None))
+            self._writes += 1
+            if self._writes % self.trim_every == 0:
+                db.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+                db.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                           (self.maxsize,))
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM cache")
+
+    def stats(self) -> dict:
+        size = self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "version": self.version,
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ProjectionCache:
+    """
+    Bounded in-process LRU cache with optional TTL for projection responses.
+    maxsize=0 disables caching; ttl=None keeps entries until they are evicted.
+    The calculator copies backend/constants.py's values when it is imported, so changing them
+    takes a restart, which starts with an empty cache (the shared tier is versioned by them).
+    With a SharedCache behind it, local misses are looked up there before computing, and
+    computed values are written to both.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, shared: Optional[SharedCache] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.warmed = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self.maxsize <= 0:
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+
+        value = self._load(key, compute)
+        self._store(key, value, now)
+        return value
+
+    def _load(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.shared.get(key) if self.shared is not None else None
+        if value is None:
+            value = compute()
+            if self.shared is not None:
+                self.shared.set(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any, now: float):
+        with self._lock:
+            expires = now + self.ttl if self.ttl else None
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def warm(self, items: Iterable[Tuple[Hashable, Callable[[], Any]]]) -> int:
+        """
+        Fill the cache ahead of traffic from (key, compute) pairs, reading the shared tier first
+        when there is one. Warm-up lookups don't count towards this cache's hits and misses.
+        """
+        count = 0
+        for key, compute in items:
+            value = self._load(key, compute)
+            if self.maxsize > 0:
+                self._store(key, value, time.monotonic())
+            count += 1
+        self.warmed += count
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "warmed": self.warmed,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
@@ -1,6 +1,24 @@
 import pandas as pd
-import numpy as np
-from typing import List, Tuple
+from typing import Optional, Sequence, Tuple
+
+from backend.constants import CHILD_RESPONSIBILITY_BANDS
+# The models themselves live in the pandas-free core; re-exported here for app.py and scripts
+from backend.core import (
+    PERIOD_COLUMNS,
+    PHASEOUT_COLUMNS,
+    TOTAL_WEALTH_COLUMNS,
+    PhaseoutSummary,
+    initial_required_cover,
+    iter_phaseout_rows,
+    iter_total_wealth_rows,
+    phaseout_no_offset_closed_form,
+    period_detail,
+    phaseout_summary,
+    project_phaseout,
+    project_total_wealth,
+    responsibility_for_age,
+    responsibility_table,
+)
 
 
 def calculator_phaseout(max_t:int,
@@ -11,64 +29,15 @@ def calculator_phaseout(max_t:int,
                         K0:float,
                         si: float,
                         S0:float,
-                        alpha:float=1.0) -> Tuple[pd.DataFrame, int]:
+                        alpha:float=1.0,
+                        periods:Optional[int]=None) -> Tuple[pd.DataFrame, int]:
     """
     Phase-out model: KiwiSaver offsets cover and premium savings are reinvested into KiwiSaver.
     Returns dataframe and the year index (relative, 1-based) when cover reaches 0 (or None).
+    periods (e.g. 12) compounds KiwiSaver per period instead of annually; rows stay annual.
     """
-    rows = []
-    Kt = float(K0)
-    full_cover_t = np.inf
-
-    for t in range(max_t+1):
-        Pt = float(P0) * (1.0 + g)**t
-
-        Ot = min(alpha * Kt, L)
-        Et = max(0.0, L - Ot)
-
-        P_off_t = Pt * (Et / L) if L > 0 else 0.0
-        dPt = Pt - P_off_t
-        Vt = dPt
-
-        St = float(S0) * (1.0 + si)**t
-        avg_capital_base = Kt + 0.5 * (St + Vt)
-        return_t = r_avg * avg_capital_base
-
-        Kt1 = Kt + St + Vt + return_t
-
-        rows.append({
-            "year": t + 1,
-            "KiwiSaver Start Balance": Kt,
-            "Baseline Premium": Pt,
-            "Offset": Ot,
-            "Effective Cover": Et,
-            "Premium w/ Offset": P_off_t,
-            "Premium Saving": dPt,
-            "Voluntary Contribution": Vt,
-            "Annual Salary Contribution": St,
-            "Annual Investment Return": return_t,
-            "KiwiSaver End Balance": Kt1
-        })
-
-        Kt = Kt1
-        if Kt >= L and full_cover_t == np.inf:
-            full_cover_t = t + 1
-
-    df = pd.DataFrame(rows)
-    if full_cover_t == np.inf:
-        full_cover_t = None
-    return df, full_cover_t
-
-
-def responsibility_for_age(age: int) -> float:
-    """Total remaining responsibility for a child of a given age until 18."""
-    total = 0.0
-    for a in range(age, 18):
-        if 0 <= a <= 15:
-            total += 35_000
-        elif 16 <= a <= 17:
-            total += 50_000
-    return total
+    result = project_phaseout(max_t, L, P0, g, r_avg, K0, si, S0, alpha, periods=periods)
+    return result.to_dataframe(), result.full_cover_t
 
 
 def calculator_total_wealth(
@@ -88,87 +57,18 @@ def calculator_total_wealth(
     asset_growth_rate: float,
     debt_shrink_rate: float,
     holding_amount: float,
-    funeral_cost: float
+    funeral_cost: float,
+    responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS,
+    periods: Optional[int] = None
 ):
     """
     Total-Wealth life cover projection with phase-out style premium calculation.
     Offsets are applied based on previous year's required cover.
+    periods (e.g. 12) compounds KiwiSaver per period instead of annually; rows stay annual.
     """
-    # Initialize start-of-year values
-    Kt = K0
-    assets_t = property_value + cash + managed_funds + other_assets
-    debt_t = liabilities
-    required_cover_prev = max(0.0, debt_t + sum([responsibility_for_age(age) for age in child_ages]) + funeral_cost + holding_amount - Kt - assets_t)
-
-    rows = []
-    full_cover_t = np.inf
-
-    for t in range(max_t + 1):
-        # ------------------ Start-of-Year Values ------------------
-        assets_start = assets_t
-        debt_start = debt_t
-        responsibilities_start = sum([responsibility_for_age(age + t) for age in child_ages])
-        total_wealth_start = Kt + assets_start
-        total_liabilities_start = debt_start + responsibilities_start + funeral_cost + holding_amount
-        required_cover_start = max(0.0, total_liabilities_start - total_wealth_start)
-
-        # ------------------ Premiums and offsets (phase-out style) ------------------
-        Pt = P0 * (1 + g) ** t
-        if t == 0:
-            premium_with_offset = Pt
-        elif required_cover_prev == 0:
-            premium_with_offset = 0
-        else:
-            premium_with_offset = Pt * required_cover_start / required_cover_prev
-        premium_saving = Pt - premium_with_offset
-        voluntary_contribution = premium_saving
-
-        # ------------------ Salary contribution and KiwiSaver growth ------------------
-        St = S0 * (1 + si) ** t
-        avg_capital_base = Kt + 0.5 * (St + voluntary_contribution)
-        return_t = r_avg * avg_capital_base
-        Kt1 = Kt + St + voluntary_contribution + return_t  # end-of-year KiwiSaver balance
-
-        # ------------------ End-of-Year Updates ------------------
-        assets_end = assets_t * (1 + asset_growth_rate)
-        debt_end = debt_t * (1 - debt_shrink_rate)
-        responsibilities_end = sum([responsibility_for_age(age + t + 1) for age in child_ages])
-
-        # ------------------ Append row ------------------
-        rows.append({
-            "year": t + 1,
-            "KiwiSaver Start Balance": Kt,
-            "Total Assets Start": assets_start,
-            "Total Liabilities Start": debt_start,
-            "Responsibilities Start": responsibilities_start,
-            "Baseline Premium": Pt,
-            "Required Cover": required_cover_start,
-            "Premium w/ Offset": premium_with_offset,
-            "Premium Saving": premium_saving,
-            "Voluntary Contribution": voluntary_contribution,
-            "Annual Salary Contribution": St,
-            "Annual Investment Return": return_t,
-            "KiwiSaver End Balance": Kt1,
-            "Total Assets": assets_end,
-            "Total Liabilities": debt_end,
-            "Responsibilities": responsibilities_end
-        })
-
-        # ------------------ Determine full_cover_t ------------------
-        gap_next = max(0.0, debt_end + responsibilities_end + funeral_cost + holding_amount - (Kt1 + assets_end))
-        if gap_next <= 0.0 and full_cover_t == np.inf:
-            full_cover_t = t + 1
-
-        # Prepare for next year
-        Kt = Kt1
-        assets_t = assets_end
-        debt_t = debt_end
-        required_cover_prev = required_cover_start  # store this for next year's premium scaling
-
-    if full_cover_t == np.inf:
-        full_cover_t = None
-
-    return pd.DataFrame(rows), full_cover_t
-
-
-
+    result = project_total_wealth(
+        max_t, P0, g, r_avg, K0, si, S0, property_value, cash, managed_funds, other_assets, liabilities,
+        child_ages, asset_growth_rate, debt_shrink_rate, holding_amount, funeral_cost, responsibility_bands,
+        periods=periods
+    )
+    return result.to_dataframe(), result.full_cover_t
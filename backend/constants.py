@@ -9,5 +9,19 @@ GROWTH_INVESTMENT_RETURN = 0.10
 BALANCED_INVESTMENT_RETURN = 0.08
 CONSERVATIVE_INVESTMENT_RETURN = 0.06
 
+# Annual return volatility (standard deviation) for the Monte Carlo mode
+GROWTH_INVESTMENT_VOLATILITY = 0.15
+BALANCED_INVESTMENT_VOLATILITY = 0.10
+CONSERVATIVE_INVESTMENT_VOLATILITY = 0.05
+
+MONTE_CARLO_PATHS = 10_000
+
+# Total-wealth model defaults
+ASSET_GROWTH_RATE = 0.05
+DEBT_SHRINK_RATE = 0.05
+
+# Yearly cost of supporting a child as (first age, last age, cost per year); support ends after the last band
+CHILD_RESPONSIBILITY_BANDS = ((0, 15, 35_000), (16, 17, 50_000))
+
 NO_OFFSET_ALPHA = 0.0
 # NO_OFFSET_INVESTMENT_RETURN = 0.08 currenlty unused
@@ -0,0 +1,537 @@
+import math
+from functools import lru_cache
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.constants import CHILD_RESPONSIBILITY_BANDS
+from backend.result import ProjectionResult
+
+# Pandas-free projection core used by the API. DataFrame versions of the models live in
+# backend/calculator.py.
+
+PHASEOUT_COLUMNS = [
+    "year",
+    "KiwiSaver Start Balance",
+    "Baseline Premium",
+    "Offset",
+    "Effective Cover",
+    "Premium w/ Offset",
+    "Premium Saving",
+    "Voluntary Contribution",
+    "Annual Salary Contribution",
+    "Annual Investment Return",
+    "KiwiSaver End Balance",
+]
+
+TOTAL_WEALTH_COLUMNS = [
+    "year",
+    "KiwiSaver Start Balance",
+    "Total Assets Start",
+    "Total Liabilities Start",
+    "Responsibilities Start",
+    "Baseline Premium",
+    "Required Cover",
+    "Premium w/ Offset",
+    "Premium Saving",
+    "Voluntary Contribution",
+    "Annual Salary Contribution",
+    "Annual Investment Return",
+    "KiwiSaver End Balance",
+    "Total Assets",
+    "Total Liabilities",
+    "Responsibilities",
+]
+
+
+PERIOD_COLUMNS = [
+    "year",
+    "period",
+    "KiwiSaver Start Balance",
+    "Premium w/ Offset",
+    "Contribution",
+    "Investment Return",
+    "KiwiSaver End Balance",
+]
+
+
+def _first_year(reached: np.ndarray) -> Optional[int]:
+    hits = np.flatnonzero(reached)
+    return int(hits[0]) + 1 if hits.size else None
+
+
+# ------------------ Sub-annual compounding ------------------
+# With periods=None the models step annually and credit contributions with half a year's return.
+# With periods=m (12 monthly, 26 fortnightly, 52 weekly) the balance compounds at the per-period
+# rate (1 + r)^(1/m) - 1 and contributions are paid in m equal instalments at the end of each
+# period. Within a year that has a closed form, so the year loop costs the same either way and
+# per-period rows are expanded afterwards from precomputed factors (see period_detail).
+
+def period_rate(r_avg: float, periods: int) -> float:
+    """Per-period return equivalent to the annual rate r_avg."""
+    if periods < 1:
+        raise ValueError("periods must be at least 1")
+    if r_avg <= -1:
+        raise ValueError("r_avg must be greater than -1 for sub-annual compounding")
+    return (1.0 + r_avg) ** (1.0 / periods) - 1.0
+
+
+def contribution_growth(r_avg: float, periods: Optional[int]) -> Optional[float]:
+    """
+    Year-end value of one dollar of annual contributions paid in `periods` end-of-period
+    instalments, or None for the annual model.
+    """
+    if periods is None:
+        return None
+    i = period_rate(r_avg, periods)
+    return 1.0 if i == 0 else r_avg / (i * periods)
+
+
+def compounding_factors(r_avg: float, periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Growth of the start-of-year balance after each period, (1 + i)^k, and of one dollar paid
+    at the end of each period, ((1 + i)^k - 1) / i, for k = 1..periods.
+    """
+    growth = np.cumprod(np.full(periods, 1.0 + period_rate(r_avg, periods)))
+    annuity = np.cumsum(np.concatenate(([1.0], growth[:-1])))
+    return growth, annuity
+
+
+def period_detail(result: ProjectionResult, r_avg: float, periods: int) -> ProjectionResult:
+    """
+    Per-period rows (PERIOD_COLUMNS) behind an annual phase-out or total-wealth result computed
+    with the same periods, all years at once; each year's last period ends on its annual
+    KiwiSaver End Balance.
+    """
+    growth, annuity = compounding_factors(r_avg, periods)
+    start = result["KiwiSaver Start Balance"][:, None]
+    contribution = ((result["Annual Salary Contribution"] + result["Voluntary Contribution"]) / periods)[:, None]
+    end = start * growth + contribution * annuity
+    begin = np.concatenate((start, end[:, :-1]), axis=1)
+
+    years = len(result)
+    detail = ProjectionResult(PERIOD_COLUMNS, years * periods)
+    detail.values[0] = np.repeat(result["year"], periods)
+    detail.values[1] = np.tile(np.arange(1, periods + 1), years)
+    detail.values[2] = begin.ravel()
+    detail.values[3] = np.repeat(result["Premium w/ Offset"] / periods, periods)
+    detail.values[4] = np.repeat(contribution[:, 0], periods)
+    detail.values[5] = (end - begin - contribution).ravel()
+    detail.values[6] = end.ravel()
+    detail.full_cover_t = result.full_cover_t
+    return detail
+
+
+def _phaseout_steps(max_t:int,
+                       L:float,
+                       P0:float,
+                       g:float,
+                       r_avg:float,
+                       K0:float,
+                       si: float,
+                       S0:float,
+                    alpha:float=1.0,
+                    start_t:int=0,
+                    periods:Optional[int]=None) -> Iterator[tuple]:
+    """
+    Phase-out model, one tuple of PHASEOUT_COLUMNS values per year.
+    With start_t > 0 the projection resumes at that year, and K0 is the balance at its start.
+    periods compounds the balance monthly/fortnightly/... instead of annually (see period_rate).
+    """
+    Kt = float(K0)
+    growth = contribution_growth(r_avg, periods)
+
+    for t in range(start_t, max_t+1):
+        Pt = float(P0) * (1.0 + g)**t
+
+        Ot = min(alpha * Kt, L)
+        Et = max(0.0, L - Ot)
+
+        P_off_t = Pt * (Et / L) if L > 0 else 0.0
+        dPt = Pt - P_off_t
+        Vt = dPt
+
+        St = float(S0) * (1.0 + si)**t
+        if growth is None:
+            avg_capital_base = Kt + 0.5 * (St + Vt)
+            return_t = r_avg * avg_capital_base
+        else:
+            return_t = r_avg * Kt + (growth - 1.0) * (St + Vt)
+
+        Kt1 = Kt + St + Vt + return_t
+
+        yield (t + 1, Kt, Pt, Ot, Et, P_off_t, dPt, Vt, St, return_t, Kt1)
+
+        Kt = Kt1
+
+
+def iter_phaseout_rows(max_t:int,
+                       L:float,
+                       P0:float,
+                       g:float,
+                       r_avg:float,
+                       K0:float,
+                       si: float,
+                       S0:float,
+                       alpha:float=1.0,
+                       periods:Optional[int]=None) -> Iterator[dict]:
+    """
+    Phase-out model rows, yielded one year at a time as they are computed (see calculator_phaseout).
+    """
+    for values in _phaseout_steps(max_t, L, P0, g, r_avg, K0, si, S0, alpha, periods=periods):
+        yield dict(zip(PHASEOUT_COLUMNS, values))
+
+
+def project_phaseout(max_t:int,
+                     L:float,
+                     P0:float,
+                     g:float,
+                     r_avg:float,
+                     K0:float,
+                     si: float,
+                     S0:float,
+                     alpha:float=1.0,
+                     periods:Optional[int]=None) -> ProjectionResult:
+    """
+    Phase-out model as an array-backed ProjectionResult; full_cover_t is the year the
+    KiwiSaver balance first covers L (or None).
+    """
+    result = ProjectionResult(PHASEOUT_COLUMNS, max_t + 1)
+    values = result.values
+    for t, step in enumerate(_phaseout_steps(max_t, L, P0, g, r_avg, K0, si, S0, alpha, periods=periods)):
+        values[:, t] = step
+    result.full_cover_t = _first_year(result["KiwiSaver End Balance"] >= L)
+    return result
+
+
+def _geometric_series(d: float, n: int) -> float:
+    """Sum of (1 + d)**t for t in 0..n-1, accurate for d close to 0."""
+    if d == 0.0:
+        return float(n)
+    return math.expm1(n * math.log1p(d)) / d
+
+
+def phaseout_no_offset_closed_form(max_t:int,
+                                   L:float,
+                                   P0:float,
+                                   g:float,
+                                   r_avg:float,
+                                   K0:float,
+                                   si: float,
+                                   S0:float) -> Tuple[float, float]:
+    """
+    O(1) equivalent of calculator_phaseout with alpha=0 (requires r_avg > -1).
+    With no offset the balance follows K(t+1) = K(t)(1+r) + c(t)(1+r/2), where c(t) is the salary
+    contribution (plus the whole premium when L is 0), so both sums are geometric.
+    Returns (total baseline premium, final KiwiSaver balance).
+    """
+    n = max_t + 1
+    R = 1.0 + r_avg
+    growth_term = 1.0 + 0.5 * r_avg
+
+    total_premium = float(P0) * _geometric_series(g, n)
+
+    # sum of x**t * R**(n-1-t) for a contribution stream growing at rate x - 1
+    def accumulated(rate: float) -> float:
+        return R**(n - 1) * _geometric_series((rate - r_avg) / R, n)
+
+    Kn = float(K0) * R**n + growth_term * float(S0) * accumulated(si)
+    if not L > 0:
+        # premium-with-offset is 0 without cover, so the whole premium is reinvested
+        Kn += growth_term * float(P0) * accumulated(g)
+
+    return total_premium, Kn
+
+
+class PhaseoutSummary(NamedTuple):
+    total_premium_with_offset: float
+    total_premium_without_offset: float
+    ks_end_with_offset: float
+    ks_end_without_offset: float
+    full_cover_t: Optional[int]
+
+
+def phaseout_summary(max_t:int,
+                     L:float,
+                     P0:float,
+                     g:float,
+                     r_avg:float,
+                     K0:float,
+                     si: float,
+                     S0:float,
+                     alpha:float=1.0,
+                     baseline_alpha:float=0.0) -> PhaseoutSummary:
+    """
+    Summary-only phase-out model: runs the offset (alpha) and no-offset (baseline_alpha) paths
+    together in one pass and keeps just the aggregates, with no rows or DataFrame.
+    Numbers match calculator_phaseout run once per alpha. A zero baseline_alpha (the API's
+    no-offset baseline) is evaluated in closed form instead of being stepped, except without
+    cover (L <= 0), where both paths are the same and stepping keeps them bit-identical.
+    """
+    closed_form_baseline = baseline_alpha == 0.0 and r_avg > -1 and L > 0
+    Kt = float(K0)
+    Kt_base = float(K0)
+    total_premium_with_offset = 0.0
+    total_premium_without_offset = 0.0
+    full_cover_t = None
+
+    for t in range(max_t+1):
+        Pt = float(P0) * (1.0 + g)**t
+        St = float(S0) * (1.0 + si)**t
+
+        # Offset path
+        Et = max(0.0, L - min(alpha * Kt, L))
+        P_off_t = Pt * (Et / L) if L > 0 else 0.0
+        Vt = Pt - P_off_t
+        Kt = Kt + St + Vt + r_avg * (Kt + 0.5 * (St + Vt))
+
+        # No-offset path
+        if not closed_form_baseline:
+            Et_base = max(0.0, L - min(baseline_alpha * Kt_base, L))
+            Vt_base = Pt - (Pt * (Et_base / L) if L > 0 else 0.0)
+            Kt_base = Kt_base + St + Vt_base + r_avg * (Kt_base + 0.5 * (St + Vt_base))
+
+        total_premium_with_offset += P_off_t
+        total_premium_without_offset += Pt
+        if Kt >= L and full_cover_t is None:
+            full_cover_t = t + 1
+
+    if closed_form_baseline:
+        _, Kt_base = phaseout_no_offset_closed_form(max_t, L, P0, g, r_avg, K0, si, S0)
+
+    return PhaseoutSummary(total_premium_with_offset, total_premium_without_offset, Kt, Kt_base, full_cover_t)
+
+
+@lru_cache(maxsize=32)
+def _responsibility_table(bands: Tuple[Tuple[int, int, float], ...]) -> Tuple[float, ...]:
+    yearly = [0.0] * (max(end for _, end, _ in bands) + 1)
+    for start, end, cost in bands:
+        for a in range(max(0, start), end + 1):
+            yearly[a] += cost
+
+    # Suffix sums: table[age] is everything still to pay from that age on
+    table = [0.0] * (len(yearly) + 1)
+    for a in range(len(yearly) - 1, -1, -1):
+        table[a] = table[a + 1] + yearly[a]
+    return tuple(table)
+
+
+def responsibility_table(bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS) -> Tuple[float, ...]:
+    """
+    Remaining responsibility by age for the given (first age, last age, cost per year) bands.
+    table[age] is the total cost from that age until support ends; ages past the table owe nothing.
+    Cached per set of bands.
+    """
+    return _responsibility_table(tuple((int(start), int(end), float(cost)) for start, end, cost in bands))
+
+
+def responsibility_for_age(age: int, bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS) -> float:
+    """Total remaining responsibility for a child of a given age until support ends (18 by default)."""
+    table = responsibility_table(bands)
+    if age >= len(table):
+        return 0.0
+    return table[max(0, age)]
+
+
+def _total_responsibility(table: Tuple[float, ...], child_ages: list, t: int) -> float:
+    last = len(table) - 1
+    return sum([table[min(last, max(0, age + t))] for age in child_ages])
+
+
+def initial_required_cover(K0: float,
+                           property_value: float,
+                           cash: float,
+                           managed_funds: float,
+                           other_assets: float,
+                           liabilities: float,
+                           child_ages: list,
+                           holding_amount: float,
+                           funeral_cost: float,
+                           responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS) -> float:
+    """Required cover today under the total-wealth approach (used to scale the baseline premium)."""
+    table = responsibility_table(responsibility_bands)
+    assets = property_value + cash + managed_funds + other_assets
+    return max(0.0, liabilities + _total_responsibility(table, child_ages, 0) + funeral_cost + holding_amount - K0 - assets)
+
+
+def _total_wealth_steps(
+    max_t: int,
+    P0: float,
+    g: float,
+    r_avg: float,
+    K0: float,
+    si: float,
+    S0: float,
+    property_value: float,
+    cash: float,
+    managed_funds: float,
+    other_assets: float,
+    liabilities: float,
+    child_ages: list,
+    asset_growth_rate: float,
+    debt_shrink_rate: float,
+    holding_amount: float,
+    funeral_cost: float,
+    responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS,
+    start_t: int = 0,
+    state: Optional[Tuple[float, float, float, float]] = None,
+    periods: Optional[int] = None
+) -> Iterator[tuple]:
+    """
+    Total-wealth model, one tuple of TOTAL_WEALTH_COLUMNS values per year.
+    Child responsibilities come from a precomputed table and are carried year to year,
+    so each year only does one lookup per child.
+    To resume at start_t, pass the carried state at its start:
+    (KiwiSaver balance, total assets, total liabilities, previous year's required cover).
+    periods compounds the KiwiSaver balance sub-annually; assets and debt still move once a year.
+    """
+    table = responsibility_table(responsibility_bands)
+    growth = contribution_growth(r_avg, periods)
+
+    # Initialize start-of-year values
+    responsibilities_t = _total_responsibility(table, child_ages, start_t)
+    if state is None:
+        Kt = K0
+        assets_t = property_value + cash + managed_funds + other_assets
+        debt_t = liabilities
+        required_cover_prev = max(0.0, debt_t + responsibilities_t + funeral_cost + holding_amount - Kt - assets_t)
+    else:
+        Kt, assets_t, debt_t, required_cover_prev = state
+
+    for t in range(start_t, max_t + 1):
+        # ------------------ Start-of-Year Values ------------------
+        assets_start = assets_t
+        debt_start = debt_t
+        responsibilities_start = responsibilities_t
+        total_wealth_start = Kt + assets_start
+        total_liabilities_start = debt_start + responsibilities_start + funeral_cost + holding_amount
+        required_cover_start = max(0.0, total_liabilities_start - total_wealth_start)
+
+        # ------------------ Premiums and offsets (phase-out style) ------------------
+        Pt = P0 * (1 + g) ** t
+        if t == 0:
+            premium_with_offset = Pt
+        elif required_cover_prev == 0:
+            premium_with_offset = 0
+        else:
+            premium_with_offset = Pt * required_cover_start / required_cover_prev
+        premium_saving = Pt - premium_with_offset
+        voluntary_contribution = premium_saving
+
+        # ------------------ Salary contribution and KiwiSaver growth ------------------
+        St = S0 * (1 + si) ** t
+        if growth is None:
+            avg_capital_base = Kt + 0.5 * (St + voluntary_contribution)
+            return_t = r_avg * avg_capital_base
+        else:
+            return_t = r_avg * Kt + (growth - 1.0) * (St + voluntary_contribution)
+        Kt1 = Kt + St + voluntary_contribution + return_t  # end-of-year KiwiSaver balance
+
+        # ------------------ End-of-Year Updates ------------------
+        assets_end = assets_t * (1 + asset_growth_rate)
+        debt_end = debt_t * (1 - debt_shrink_rate)
+        responsibilities_end = _total_responsibility(table, child_ages, t + 1)
+
+        # ------------------ Yield row ------------------
+        yield (
+            t + 1,
+            Kt,
+            assets_start,
+            debt_start,
+            responsibilities_start,
+            Pt,
+            required_cover_start,
+            premium_with_offset,
+            premium_saving,
+            voluntary_contribution,
+            St,
+            return_t,
+            Kt1,
+            assets_end,
+            debt_end,
+            responsibilities_end
+        )
+
+        # Prepare for next year
+        Kt = Kt1
+        assets_t = assets_end
+        debt_t = debt_end
+        responsibilities_t = responsibilities_end
+        required_cover_prev = required_cover_start  # store this for next year's premium scaling
+
+
+def iter_total_wealth_rows(
+    max_t: int,
+    P0: float,
+    g: float,
+    r_avg: float,
+    K0: float,
+    si: float,
+    S0: float,
+    property_value: float,
+    cash: float,
+    managed_funds: float,
+    other_assets: float,
+    liabilities: float,
+    child_ages: list,
+    asset_growth_rate: float,
+    debt_shrink_rate: float,
+    holding_amount: float,
+    funeral_cost: float,
+    responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS,
+    periods: Optional[int] = None
+) -> Iterator[dict]:
+    """
+    Total-wealth model rows, yielded one year at a time as they are computed (see calculator_total_wealth).
+    """
+    for values in _total_wealth_steps(
+        max_t, P0, g, r_avg, K0, si, S0, property_value, cash, managed_funds, other_assets, liabilities,
+        child_ages, asset_growth_rate, debt_shrink_rate, holding_amount, funeral_cost, responsibility_bands,
+        periods=periods
+    ):
+        yield dict(zip(TOTAL_WEALTH_COLUMNS, values))
+
+
+def project_total_wealth(
+    max_t: int,
+    P0: float,
+    g: float,
+    r_avg: float,
+    K0: float,
+    si: float,
+    S0: float,
+    property_value: float,
+    cash: float,
+    managed_funds: float,
+    other_assets: float,
+    liabilities: float,
+    child_ages: list,
+    asset_growth_rate: float,
+    debt_shrink_rate: float,
+    holding_amount: float,
+    funeral_cost: float,
+    responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS,
+    periods: Optional[int] = None
+) -> ProjectionResult:
+    """
+    Total-wealth model as an array-backed ProjectionResult; full_cover_t is the first year after
+    which next year's liabilities are met by KiwiSaver plus assets (or None).
+    """
+    result = ProjectionResult(TOTAL_WEALTH_COLUMNS, max_t + 1)
+    values = result.values
+    for t, step in enumerate(_total_wealth_steps(
+        max_t, P0, g, r_avg, K0, si, S0, property_value, cash, managed_funds, other_assets, liabilities,
+        child_ages, asset_growth_rate, debt_shrink_rate, holding_amount, funeral_cost, responsibility_bands,
+        periods=periods
+    )):
+        values[:, t] = step
+
+    result.full_cover_t = _total_wealth_full_cover_t(result, funeral_cost, holding_amount)
+    return result
+
+
+def _total_wealth_full_cover_t(result: ProjectionResult, funeral_cost: float, holding_amount: float) -> Optional[int]:
+    """First year after which next year's liabilities are met by KiwiSaver plus assets (or None)."""
+    gap_next = np.maximum(0.0, result["Total Liabilities"] + result["Responsibilities"] + funeral_cost + holding_amount
+                          - (result["KiwiSaver End Balance"] + result["Total Assets"]))
+    return _first_year(gap_next <= 0.0)
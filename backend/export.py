@@ -0,0 +1,203 @@
+"""
+Year-by-year projection tables for a batch of clients, as Arrow IPC, Parquet or CSV.
+
+    python -m backend.export clients.ndjson --model total-wealth --out book.arrow
+
+Output is produced one chunk of clients at a time (EXPORT_CHUNK_SIZE), so memory is bounded by
+the chunk, not the batch. Every format has the same fixed schema per model: "client" (index in
+the batch), "age" and "year" as int64, then the model's columns in order as float64, none
+nullable. Arrow output is the IPC file format, uncompressed, so readers can memory-map it
+(pyarrow.memory_map + pyarrow.ipc.open_file); each chunk is one record batch / row group.
+Arrow and Parquet need pyarrow (the "arrow" extra); CSV always works.
+"""
+import argparse
+import csv
+import importlib.util
+import io
+import itertools
+import os
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from backend.core import PHASEOUT_COLUMNS, TOTAL_WEALTH_COLUMNS, project_phaseout, project_total_wealth
+from backend.models import ProjectionRequest, TotalWealthRequest
+from backend.projection import phaseout_inputs, total_wealth_inputs
+from backend.result import ProjectionResult
+from backend.constants import NO_OFFSET_ALPHA, OFFSET_ALPHA
+
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 256))
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+}
+
+MODELS = {
+    "phaseout": (ProjectionRequest, PHASEOUT_COLUMNS),
+    "total-wealth": (TotalWealthRequest, TOTAL_WEALTH_COLUMNS),
+}
+
+_INT_COLUMNS = ("client", "age", "year")
+
+
+def export_columns(model: str) -> List[str]:
+    return ["client", "age", *MODELS[model][1]]
+
+
+def arrow_schema(model: str):
+    """The fixed pyarrow schema of an export."""
+    import pyarrow as pa
+
+    return pa.schema([
+        pa.field(name, pa.int64() if name in _INT_COLUMNS else pa.float64(), nullable=False)
+        for name in export_columns(model)
+    ])
+
+
+def project_requests(model: str, reqs: Iterable, scenario: str = "offset") -> Iterator[Tuple[int, ProjectionResult]]:
+    """(current_age, result) per request, computed lazily in batch order."""
+    alpha = OFFSET_ALPHA if scenario == "offset" else NO_OFFSET_ALPHA
+    for req in reqs:
+        if model == "phaseout":
+            result = project_phaseout(**phaseout_inputs(req, alpha))
+        else:
+            result = project_total_wealth(**total_wealth_inputs(req)[0])
+        yield req.current_age, result
+
+
+def _chunk_arrays(chunk: List[Tuple[int, ProjectionResult]], first_client: int, columns: List[str]) -> List[np.ndarray]:
+    lengths = [len(result) for _, result in chunk]
+    years = np.concatenate([result["year"] for _, result in chunk]).astype(np.int64)
+    arrays = [
+        np.repeat(np.arange(first_client, first_client + len(chunk), dtype=np.int64), lengths),
+        np.repeat(np.array([age for age, _ in chunk], dtype=np.int64), lengths) + years - 1,
+        years,
+    ]
+    arrays += [np.concatenate([result[name] for _, result in chunk]) for name in columns[1:]]
+    return arrays
+
+
+class _Buffer(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+class _ArrowWriter:
+    def __init__(self, model: str):
+        import pyarrow as pa
+
+        self._pa = pa
+        self._schema = arrow_schema(model)
+        self._buffer = _Buffer()
+        self._writer = pa.ipc.new_file(self._buffer, self._schema)
+
+    def _batch(self, arrays: List[np.ndarray]):
+        return self._pa.RecordBatch.from_arrays(
+            [self._pa.array(array, type=field.type) for array, field in zip(arrays, self._schema)], schema=self._schema
+        )
+
+    def write(self, arrays: List[np.ndarray]) -> bytes:
+        self._writer.write_batch(self._batch(arrays))
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._buffer.drain()
+
+
+class _ParquetWriter(_ArrowWriter):
+    def __init__(self, model: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = arrow_schema(model)
+        self._buffer = _Buffer()
+        # Each write_batch call becomes one row group
+        self._writer = pq.ParquetWriter(self._buffer, self._schema)
+
+
+class _CsvWriter:
+    def __init__(self, model: str):
+        self._header = export_columns(model)
+
+    def write(self, arrays: List[np.ndarray]) -> bytes:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if self._header is not None:
+            writer.writerow(self._header)
+            self._header = None
+        writer.writerows(zip(*(array.tolist() for array in arrays)))
+        return out.getvalue().encode()
+
+    def close(self) -> bytes:
+        return b""
+
+
+_WRITERS = {"arrow": _ArrowWriter, "parquet": _ParquetWriter, "csv": _CsvWriter}
+
+
+def stream_export(model: str,
+                  results: Iterable[Tuple[int, ProjectionResult]],
+                  fmt: str = "arrow",
+                  chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode (current_age, result) pairs from project_requests as one table in fmt, yielding the
+    bytes for each chunk of chunk_size clients as soon as it is written.
+    """
+    if fmt != "csv" and not HAS_PYARROW:
+        raise ImportError(f"{fmt} export needs pyarrow (pip install .[arrow]); use csv instead")
+    writer = _WRITERS[fmt](model)
+    columns = MODELS[model][1]
+    results = iter(results)
+    first_client = 0
+    while True:
+        chunk = list(itertools.islice(results, chunk_size))
+        if not chunk:
+            break
+        yield writer.write(_chunk_arrays(chunk, first_client, columns))
+        first_client += len(chunk)
+    yield writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export year-by-year projection tables for a batch of clients")
+    parser.add_argument("inputs", help="NDJSON file, one /calculate (or /calculate/total-wealth) body per line")
+    parser.add_argument("--model", choices=sorted(MODELS), default="phaseout")
+    parser.add_argument("--scenario", choices=["offset", "no_offset"], default="offset", help="phase-out only")
+    parser.add_argument("--out", required=True, help="output path; the format follows the extension (.arrow, .parquet, .csv)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = os.path.splitext(args.out)[1].lstrip(".")
+    if fmt not in _WRITERS:
+        parser.error("--out must end in .arrow, .parquet or .csv")
+
+    request_model = MODELS[args.model][0]
+    with open(args.inputs) as f:
+        reqs = (request_model.model_validate_json(line) for line in f if line.strip())
+        with open(args.out, "wb") as out:
+            for data in stream_export(args.model, project_requests(args.model, reqs, args.scenario), fmt, args.chunk_size):
+                out.write(data)
+
+
+if __name__ == "__main__":
+    main()
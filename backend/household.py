@@ -0,0 +1,176 @@
+import numpy as np
+from typing import List, NamedTuple, Sequence
+
+from backend.constants import CHILD_RESPONSIBILITY_BANDS
+from backend.core import (
+    TOTAL_WEALTH_COLUMNS,
+    _total_responsibility,
+    _total_wealth_full_cover_t,
+    responsibility_table,
+)
+from backend.result import ProjectionResult
+
+MEMBER_COLUMNS = [
+    "year",
+    "KiwiSaver Start Balance",
+    "Baseline Premium",
+    "Premium w/ Offset",
+    "Premium Saving",
+    "Voluntary Contribution",
+    "Annual Salary Contribution",
+    "Annual Investment Return",
+    "KiwiSaver End Balance",
+]
+
+
+class HouseholdProjection(NamedTuple):
+    household: ProjectionResult       # TOTAL_WEALTH_COLUMNS, KiwiSaver and premium columns summed over members
+    members: List[ProjectionResult]   # MEMBER_COLUMNS, one per member
+
+
+def shared_schedules(years: int,
+                     assets: float,
+                     liabilities: float,
+                     child_ages: list,
+                     asset_growth_rate: float,
+                     debt_shrink_rate: float,
+                     responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS):
+    """
+    Total assets, liabilities and child responsibilities at the start of each year 0..years,
+    computed once for the whole household. The products accumulate in the same order as the
+    year-by-year model, so the values are identical to it.
+    """
+    table = responsibility_table(responsibility_bands)
+    asset_path = np.cumprod(np.concatenate(([assets], np.full(years, 1 + asset_growth_rate))))
+    debt_path = np.cumprod(np.concatenate(([liabilities], np.full(years, 1 - debt_shrink_rate))))
+    responsibilities = np.array([_total_responsibility(table, child_ages, t) for t in range(years + 1)], dtype=float)
+    return asset_path, debt_path, responsibilities
+
+
+def project_household(
+    max_t: Sequence[int],
+    P0: Sequence[float],
+    g: float,
+    r_avg: Sequence[float],
+    K0: Sequence[float],
+    si: float,
+    S0: Sequence[float],
+    property_value: float,
+    cash: float,
+    managed_funds: float,
+    other_assets: float,
+    liabilities: float,
+    child_ages: list,
+    asset_growth_rate: float,
+    debt_shrink_rate: float,
+    holding_amount: float,
+    funeral_cost: float,
+    responsibility_bands: Sequence[Sequence[float]] = CHILD_RESPONSIBILITY_BANDS
+) -> HouseholdProjection:
+    """
+    Total-wealth model for a household: max_t, P0, r_avg, K0 and S0 are per member, the assets,
+    debts and children are shared. Each year's required cover is the shared liabilities less the
+    shared assets and every member's KiwiSaver; each member's premium is scaled by it as in
+    project_total_wealth and their premium saving goes into their own KiwiSaver. Members stop
+    contributing and paying premiums after their own max_t; the projection runs to the latest.
+    With one member the household table is bit-identical to project_total_wealth's.
+    """
+    n = len(K0)
+    years = max(max_t) + 1
+    t = np.arange(years)
+
+    # ------------------ Shared components, once per household ------------------
+    assets, debt, responsibilities = shared_schedules(
+        years, property_value + cash + managed_funds + other_assets, liabilities, child_ages,
+        asset_growth_rate, debt_shrink_rate, responsibility_bands
+    )
+
+    # ------------------ Member schedules, all members and years at once ------------------
+    # Escalation factors use Python's pow, as the single-person model does, so results match it exactly
+    premium_growth = np.array([(1 + g) ** year for year in range(years)])
+    salary_growth = np.array([(1 + si) ** year for year in range(years)])
+    active = t[None, :] <= np.asarray(max_t)[:, None]
+    premiums = np.where(active, np.asarray(P0, dtype=float)[:, None] * premium_growth, 0.0)
+    salaries = np.where(active, np.asarray(S0, dtype=float)[:, None] * salary_growth, 0.0)
+
+    # ------------------ Year loop ------------------
+    # Sequential in years (each year's cover depends on the household balance); per member it is
+    # a few float operations, cheaper than array calls for a household-sized vector.
+    asset_start, debt_start, responsibilities_start = assets.tolist(), debt.tolist(), responsibilities.tolist()
+    premium_rows, salary_rows = premiums.T.tolist(), salaries.T.tolist()
+    rates = [float(r) for r in r_avg]
+    balances = [float(k) for k in K0]
+    members = range(n)
+
+    start_rows, offset_rows, return_rows, required = [], [], [], []
+    required_prev = None
+    for year in range(years):
+        # Same addition order as the single-person model, so one member reproduces it bit for bit
+        total_liabilities_start = debt_start[year] + responsibilities_start[year] + funeral_cost + holding_amount
+        required_start = max(0.0, total_liabilities_start - (sum(balances) + asset_start[year]))
+
+        Pt = premium_rows[year]
+        if year == 0:
+            offset = Pt
+        elif required_prev == 0:
+            offset = [0.0] * n
+        else:
+            offset = [Pt[i] * required_start / required_prev for i in members]
+
+        St = salary_rows[year]
+        start_rows.append(balances)
+        offset_rows.append(offset)
+        returns = []
+        next_balances = []
+        for i in members:
+            Kt = balances[i]
+            Vt = Pt[i] - offset[i]
+            return_t = rates[i] * (Kt + 0.5 * (St[i] + Vt))
+            returns.append(return_t)
+            next_balances.append(Kt + St[i] + Vt + return_t)
+        return_rows.append(returns)
+        required.append(required_start)
+
+        balances = next_balances
+        required_prev = required_start
+    start_rows.append(balances)
+
+    # ------------------ Member and household tables ------------------
+    K = np.array(start_rows).T
+    offsets = np.array(offset_rows).T
+    savings = premiums - offsets
+    columns = {
+        "KiwiSaver Start Balance": K[:, :-1],
+        "Baseline Premium": premiums,
+        "Premium w/ Offset": offsets,
+        "Premium Saving": savings,
+        "Voluntary Contribution": savings,
+        "Annual Salary Contribution": salaries,
+        "Annual Investment Return": np.array(return_rows).T,
+        "KiwiSaver End Balance": K[:, 1:],
+    }
+
+    member_results = []
+    for i in members:
+        result = ProjectionResult(MEMBER_COLUMNS, years)
+        result.values[0] = t + 1
+        for row, name in enumerate(MEMBER_COLUMNS[1:], 1):
+            result.values[row] = columns[name][i]
+        member_results.append(result)
+
+    household = ProjectionResult(TOTAL_WEALTH_COLUMNS, years)
+    shared = {
+        "year": t + 1,
+        "Total Assets Start": assets[:-1],
+        "Total Liabilities Start": debt[:-1],
+        "Responsibilities Start": responsibilities[:-1],
+        "Required Cover": required,
+        "Total Assets": assets[1:],
+        "Total Liabilities": debt[1:],
+        "Responsibilities": responsibilities[1:],
+    }
+    # Shared columns come straight from the schedules; member columns are summed
+    for row, name in enumerate(TOTAL_WEALTH_COLUMNS):
+        household.values[row] = shared[name] if name in shared else columns[name].sum(axis=0)
+    household.full_cover_t = _total_wealth_full_cover_t(household, funeral_cost, holding_amount)
+    return HouseholdProjection(household, member_results)
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from backend.constants import CHILD_RESPONSIBILITY_BANDS
+from backend.core import (
+    PHASEOUT_COLUMNS,
+    TOTAL_WEALTH_COLUMNS,
+    _first_year,
+    _phaseout_steps,
+    _total_responsibility,
+    _total_wealth_full_cover_t,
+    _total_wealth_steps,
+    project_phaseout,
+    project_total_wealth,
+    responsibility_table,
+)
+from backend.result import ProjectionResult
+
+# Resuming a projection from the first year a changed input affects. Rows before that year are
+# copied from the previous result and the year loop restarts from the state carried into it, so
+# the output is identical to a full recompute.
+
+
+def first_changed_year(previous_inputs: dict, inputs: dict) -> int:
+    """
+    First row of the previous projection that is different under the new inputs
+    (previous max_t + 1 if none is, e.g. when only the horizon was extended).
+
+    Only the horizon and child responsibilities can leave early years untouched; any other
+    change feeds into year 0.
+    """
+    changed = {key for key in inputs.keys() | previous_inputs.keys() if inputs.get(key) != previous_inputs.get(key)}
+    start = min(previous_inputs["max_t"], inputs["max_t"]) + 1
+    changed.discard("max_t")
+
+    if changed & {"child_ages", "responsibility_bands"}:
+        changed -= {"child_ages", "responsibility_bands"}
+        old_table = responsibility_table(previous_inputs.get("responsibility_bands", CHILD_RESPONSIBILITY_BANDS))
+        new_table = responsibility_table(inputs.get("responsibility_bands", CHILD_RESPONSIBILITY_BANDS))
+        for t in range(start + 1):
+            if (_total_responsibility(old_table, previous_inputs["child_ages"], t)
+                    != _total_responsibility(new_table, inputs["child_ages"], t)):
+                # Year t - 1 already carries year t's responsibilities in its end-of-year column
+                start = max(0, t - 1)
+                break
+
+    return 0 if changed else start
+
+
+def _resumed(previous: ProjectionResult, columns: list, max_t: int, start: int) -> ProjectionResult:
+    result = ProjectionResult(columns, max_t + 1)
+    kept = min(start, max_t + 1)
+    result.values[:, :kept] = previous.values[:, :kept]
+    return result
+
+
+def resume_phaseout(previous: ProjectionResult,
+                    previous_inputs: dict,
+                    max_t:int,
+                    L:float,
+                    P0:float,
+                    g:float,
+                    r_avg:float,
+                    K0:float,
+                    si: float,
+                    S0:float,
+                    alpha:float=1.0,
+                    periods:Optional[int]=None) -> ProjectionResult:
+    """
+    project_phaseout for the new inputs, reusing the rows of `previous` (computed from
+    previous_inputs) that the change does not affect.
+    """
+    inputs = dict(max_t=max_t, L=L, P0=P0, g=g, r_avg=r_avg, K0=K0, si=si, S0=S0, alpha=alpha, periods=periods)
+    start = first_changed_year(previous_inputs, inputs)
+    if start == 0:
+        return project_phaseout(**inputs)
+
+    result = _resumed(previous, PHASEOUT_COLUMNS, max_t, start)
+    values = result.values
+    Kt = previous["KiwiSaver End Balance"][start - 1]
+    for t, step in enumerate(_phaseout_steps(max_t, L, P0, g, r_avg, Kt, si, S0, alpha, start_t=start, periods=periods), start):
+        values[:, t] = step
+    result.full_cover_t = _first_year(result["KiwiSaver End Balance"] >= L)
+    return result
+
+
+def resume_total_wealth(previous: ProjectionResult, previous_inputs: dict, **inputs) -> ProjectionResult:
+    """
+    project_total_wealth for the new inputs (same keyword arguments), reusing the rows of
+    `previous` (computed from previous_inputs) that the change does not affect.
+    """
+    inputs.setdefault("responsibility_bands", CHILD_RESPONSIBILITY_BANDS)
+    previous_inputs = {"responsibility_bands": CHILD_RESPONSIBILITY_BANDS, **previous_inputs}
+    start = first_changed_year(previous_inputs, inputs)
+    if start == 0:
+        return project_total_wealth(**inputs)
+
+    result = _resumed(previous, TOTAL_WEALTH_COLUMNS, inputs["max_t"], start)
+    values = result.values
+    row = start - 1
+    state = (
+        previous["KiwiSaver End Balance"][row],
+        previous["Total Assets"][row],
+        previous["Total Liabilities"][row],
+        previous["Required Cover"][row],
+    )
+    for t, step in enumerate(_total_wealth_steps(**inputs, start_t=start, state=state), start):
+        values[:, t] = step
+    result.full_cover_t = _total_wealth_full_cover_t(result, inputs["funeral_cost"], inputs["holding_amount"])
+    return result
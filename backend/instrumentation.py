@@ -0,0 +1,202 @@
+"""
+Opt-in request instrumentation for the API.
+
+With API_INSTRUMENTATION=1, every request collects per-stage timings (spans) that are returned
+as a Server-Timing header and aggregated into Prometheus-style histograms served at /metrics.
+With API_PROFILE=1 as well, a request sent with an "X-Profile: 1" header is run under cProfile
+and its pstats report is written to API_PROFILE_DIR (path returned in X-Profile-Report). Async
+handlers are profiled in the threads that run their CPU-bound work (see profiled), not on the event loop.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+ENABLED = os.environ.get("API_INSTRUMENTATION", "0") == "1"
+PROFILING = os.environ.get("API_PROFILE", "0") == "1"
+PROFILE_DIR = os.environ.get("API_PROFILE_DIR", tempfile.gettempdir())
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _RequestTimings:
+    __slots__ = ("started", "spans", "profile", "profiler", "profiler_lock")
+
+    def __init__(self, profile: bool):
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+        self.profile = profile
+        self.profiler: Optional[cProfile.Profile] = None
+        self.profiler_lock = threading.Lock()
+
+
+_current: ContextVar[Optional[_RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as one stage of the current request. No-op outside an instrumented request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.spans.append((name, time.perf_counter() - started))
+
+
+def profiled(fn):
+    """
+    fn wrapped to run under the current request's profiler in whichever thread calls it, or fn
+    itself when the request isn't being profiled. cProfile only sees the thread it was enabled in,
+    so async handlers pass the work they send off the event loop through this.
+    """
+    timings = _current.get()
+    if timings is None or timings.profiler is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # One profiler per request: concurrent calls (e.g. batch chunks) take turns
+        with timings.profiler_lock:
+            timings.profiler.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.profiler.disable()
+    return wrapper
+
+
+def instrumented(handler):
+    """
+    Route decorator: records everything before the handler ran (body parsing and Pydantic
+    validation) as the "validate" stage, and runs the handler under cProfile when requested.
+    An async handler runs on the event loop, which would profile the loop's other coroutines and
+    none of the work it hands to threads, so its profiler is only enabled by profiled.
+    """
+    is_async = inspect.iscoroutinefunction(handler)
+
+    def enter():
+        timings = _current.get()
+        if timings is None:
+            return None
+        timings.spans.append(("validate", time.perf_counter() - timings.started))
+        if timings.profile:
+            timings.profiler = cProfile.Profile()
+            if not is_async:
+                timings.profiler.enable()
+        return timings
+
+    def leave(timings):
+        if timings is not None and timings.profiler is not None and not is_async:
+            timings.profiler.disable()
+
+    if is_async:
+        @functools.wraps(handler)
+        async def async_wrapper(*args, **kwargs):
+            timings = enter()
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                leave(timings)
+        return async_wrapper
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        timings = enter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            leave(timings)
+    return wrapper
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, label_names: Tuple[str, ...]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                label_text = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+                lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+request_latency = Histogram("api_request_duration_seconds", "Request latency by route and status.")
+stage_latency = Histogram("api_stage_duration_seconds", "Time spent in each stage of a request.")
+
+
+def render_metrics() -> str:
+    lines = request_latency.render(("path", "status")) + stage_latency.render(("path", "stage"))
+    return "\n".join(lines) + "\n"
+
+
+def _write_profile(profiler: cProfile.Profile, path_label: str) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+    report_path = os.path.join(PROFILE_DIR, f"profile-{path_label.strip('/').replace('/', '_') or 'root'}-{uuid.uuid4().hex[:8]}.txt")
+    with open(report_path, "w") as f:
+        f.write(out.getvalue())
+    return report_path
+
+
+async def timing_middleware(request, call_next):
+    """HTTP middleware: collects spans for the request, adds Server-Timing and records histograms."""
+    timings = _RequestTimings(profile=PROFILING and request.headers.get("x-profile") == "1")
+    token = _current.set(timings)
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total = time.perf_counter() - timings.started
+
+    route = request.scope.get("route")
+    path_label = getattr(route, "path", request.url.path)
+
+    # Whatever the spans don't cover is framework time: response encoding and middleware
+    spans = timings.spans + [("other", max(0.0, total - sum(d for _, d in timings.spans)))]
+    response.headers["Server-Timing"] = ", ".join(
+        [f"{name};dur={duration * 1000:.3f}" for name, duration in spans] + [f"total;dur={total * 1000:.3f}"]
+    )
+
+    request_latency.observe((path_label, str(response.status_code)), total)
+    for name, duration in spans:
+        stage_latency.observe((path_label, name), duration)
+
+    if timings.profiler is not None:
+        response.headers["X-Profile-Report"] = _write_profile(timings.profiler, path_label)
+    return response
@@ -0,0 +1,202 @@
+"""
+Background jobs for large portfolio re-projections.
+
+Jobs and their results are kept in a local SQLite file (JOBS_DB_PATH), so queued work survives
+restarts: a job that was running when the process stopped is put back in the queue on startup.
+A single dispatcher thread takes one job at a time and shards it across a process pool of
+JOBS_WORKERS low-priority processes, leaving the API's own process free for interactive requests.
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "jobs.sqlite3")
+JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+JOBS_CHUNK_SIZE = int(os.environ.get("JOBS_CHUNK_SIZE", 500))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    requests TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    summaries TEXT NOT NULL,
+    PRIMARY KEY (job_id, chunk)
+);
+"""
+
+
+def _worker_init():
+    # Batch work yields the CPU to interactive requests
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _project_chunk(requests: List[dict]) -> str:
+    """Runs in a worker process: summaries for one chunk, as NDJSON."""
+    from backend.models import ProjectionRequest
+    from backend.projection import summarise_projection
+
+    return "".join(json.dumps(summarise_projection(ProjectionRequest(**r))) + "\n" for r in requests)
+
+
+class JobManager:
+    def __init__(self, db_path: str = JOBS_DB_PATH, workers: int = JOBS_WORKERS, chunk_size: int = JOBS_CHUNK_SIZE):
+        self.db_path = db_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    # ------------------ API side ------------------
+    def start(self):
+        """Create the store if needed and start the dispatcher thread."""
+        if self._thread is not None:
+            return
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-dispatcher", daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, requests: List[dict]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, total, created, requests) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, len(requests), time.time(), json.dumps(requests)),
+            )
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT id, status, total, done, error, created, started, finished FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["progress"] = round(job["done"] / job["total"], 4) if job["total"] else 1.0
+        return job
+
+    def results(self, job_id: str):
+        """NDJSON summaries in input order, streamed chunk by chunk from the store."""
+        db = self._connect()
+        try:
+            for row in db.execute("SELECT summaries FROM job_results WHERE job_id = ? ORDER BY chunk", (job_id,)):
+                yield row["summaries"]
+        finally:
+            db.close()
+
+    # ------------------ Dispatcher ------------------
+    def _next_job(self, db: sqlite3.Connection) -> Optional[sqlite3.Row]:
+        return db.execute("SELECT id, requests FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1").fetchone()
+
+    def _lock_dispatcher(self) -> bool:
+        """
+        Only one process per store runs jobs (every API worker has a JobManager). The lock is
+        released by the OS if its holder dies, and another worker then takes over.
+        """
+        if fcntl is None:
+            return True
+        self._lock_file = open(self.db_path + ".lock", "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def _run(self):
+        while not self._lock_dispatcher():
+            if self._stop.wait(timeout=5):
+                return
+        try:
+            self._dispatch()
+        finally:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _dispatch(self):
+        # Jobs left running by a dispatcher that stopped are started again from scratch
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'queued', done = 0 WHERE status = 'running'")
+            db.execute("DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs WHERE status = 'queued')")
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_worker_init) as pool:
+            db = self._connect()
+            try:
+                while not self._stop.is_set():
+                    job = self._next_job(db)
+                    if job is None:
+                        self._wake.wait(timeout=5)
+                        self._wake.clear()
+                        continue
+                    self._process(db, pool, job["id"], json.loads(job["requests"]))
+            finally:
+                db.close()
+
+    def _process(self, db: sqlite3.Connection, pool: ProcessPoolExecutor, job_id: str, requests: List[dict]):
+        with db:
+            db.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?", (time.time(), job_id))
+
+        chunks = [requests[i:i + self.chunk_size] for i in range(0, len(requests), self.chunk_size)]
+        try:
+            futures = {pool.submit(_project_chunk, chunk): (index, len(chunk)) for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                index, size = futures[future]
+                with db:
+                    db.execute("INSERT OR REPLACE INTO job_results VALUES (?, ?, ?)", (job_id, index, future.result()))
+                    db.execute("UPDATE jobs SET done = done + ? WHERE id = ?", (size, job_id))
+                if self._stop.is_set():
+                    # Left as 'running' so it is requeued on the next start
+                    for pending in futures:
+                        pending.cancel()
+                    return
+        except Exception as e:
+            with db:
+                db.execute("UPDATE jobs SET status = 'failed', error = ?, finished = ? WHERE id = ?",
+                           (repr(e), time.time(), job_id))
+            return
+
+        with db:
+            db.execute("UPDATE jobs SET status = 'done', finished = ? WHERE id = ?", (time.time(), job_id))
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+from backend.constants import ASSET_GROWTH_RATE, DEBT_SHRINK_RATE, MONTE_CARLO_PATHS
 
 class ProjectionRequest(BaseModel):
     current_age: int = Field(ge=0, le=64)
@@ -7,4 +10,54 @@ class ProjectionRequest(BaseModel):
     kiwisaver_balance: float = Field(ge=0)
     salary: float = Field(ge=0)
     kiwisaver_rate: float = Field(ge=0)
-    investment_type: str = "balanced"
\ No newline at end of file
+    investment_type: str = "balanced"
+
+
+class MonteCarloRequest(ProjectionRequest):
+    n_paths: int = Field(default=MONTE_CARLO_PATHS, ge=100, le=100_000)
+    seed: Optional[int] = None
+    mean_return: Optional[float] = Field(default=None, gt=-1)
+    volatility: Optional[float] = Field(default=None, ge=0)
+
+
+# Assets, debts and children of a total-wealth projection (shared by all members of a household)
+class SharedFinances(BaseModel):
+    property_value: float = Field(default=0, ge=0)
+    cash: float = Field(default=0, ge=0)
+    managed_funds: float = Field(default=0, ge=0)
+    other_assets: float = Field(default=0, ge=0)
+    liabilities: float = Field(default=0, ge=0)
+    child_ages: List[Annotated[int, Field(ge=0, le=30)]] = Field(default=[], max_length=20)
+    holding_amount: float = Field(default=0, ge=0)
+    funeral_cost: float = Field(default=0, ge=0)
+    asset_growth_rate: float = ASSET_GROWTH_RATE
+    debt_shrink_rate: float = Field(default=DEBT_SHRINK_RATE, le=1)
+
+
+class TotalWealthRequest(SharedFinances, ProjectionRequest):
+    # Compound KiwiSaver monthly, fortnightly or weekly instead of annually; the response then
+    # also carries the per-period rows
+    periods: Optional[Literal[12, 26, 52]] = None
+    # Response format: round every value to float32 precision for a smaller payload
+    float32: bool = False
+
+
+class HouseholdRequest(SharedFinances):
+    # Each member's own KiwiSaver, salary and life policy; everything else is shared
+    members: List[ProjectionRequest] = Field(min_length=1, max_length=10)
+    float32: bool = False
+
+
+class SolveRequest(ProjectionRequest):
+    solve_for: Literal["kiwisaver_rate", "kiwisaver_balance", "premium"] = "kiwisaver_rate"
+    # Exactly one target: age by which cover should no longer be needed, or KiwiSaver balance at 65
+    target_age: Optional[int] = Field(default=None, ge=1, le=65)
+    target_balance: Optional[float] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.target_age is None) == (self.target_balance is None):
+            raise ValueError("Provide exactly one of target_age or target_balance")
+        if self.target_age is not None and self.target_age <= self.current_age:
+            raise ValueError("target_age must be after current_age")
+        return self
@@ -0,0 +1,68 @@
+import numpy as np
+from typing import Optional, Sequence
+
+from backend.constants import MONTE_CARLO_PATHS
+from backend.vectorized import calculator_phaseout_batch
+
+TRAJECTORY_COLUMNS = ["KiwiSaver End Balance", "Effective Cover", "Premium w/ Offset"]
+
+
+def sample_returns(n_paths: int,
+                   n_years: int,
+                   mean: float,
+                   volatility: float,
+                   seed: Optional[int] = None) -> np.ndarray:
+    """
+    Per-year return paths, shape (n_paths, n_years). Returns are lognormal in (1 + r) so a year
+    can never lose more than everything, with the arithmetic mean and standard deviation given.
+    """
+    rng = np.random.default_rng(seed)
+    sigma2 = np.log1p(volatility**2 / (1.0 + mean)**2)
+    mu = np.log1p(mean) - 0.5 * sigma2
+    returns = rng.normal(mu, np.sqrt(sigma2), size=(n_paths, n_years))
+    return np.expm1(returns, out=returns)
+
+
+def simulate_phaseout(max_t: int,
+                      L: float,
+                      P0: float,
+                      g: float,
+                      K0: float,
+                      si: float,
+                      S0: float,
+                      mean: float,
+                      volatility: float,
+                      alpha: float = 1.0,
+                      n_paths: int = MONTE_CARLO_PATHS,
+                      seed: Optional[int] = None,
+                      percentiles: Sequence[float] = (10, 50, 90)) -> dict:
+    """
+    Monte Carlo phase-out model: runs calculator_phaseout over n_paths random return paths in one
+    vectorised pass. Returns per-year percentile trajectories of the main columns and the
+    distribution of full_cover_t (None where the percentile path never reaches full cover).
+    """
+    returns = sample_returns(n_paths, max_t + 1, mean, volatility, seed)
+    out, full_cover_t = calculator_phaseout_batch(max_t, L, P0, g, returns, K0, si, S0, alpha,
+                                                  columns=TRAJECTORY_COLUMNS)
+
+    trajectories = {
+        # The buffers aren't needed afterwards, so they are partitioned in place instead of copied
+        col: {f"p{p:g}": values.tolist()
+              for p, values in zip(percentiles, np.percentile(out[col], percentiles, axis=0, overwrite_input=True))}
+        for col in TRAJECTORY_COLUMNS
+    }
+
+    # Paths that never reach full cover sort last; inverted_cdf keeps each percentile an actual path's year
+    cover_years = np.where(np.isnan(full_cover_t), np.inf, full_cover_t)
+    cover_percentiles = np.percentile(cover_years, percentiles, method="inverted_cdf")
+    years, counts = np.unique(full_cover_t[~np.isnan(full_cover_t)], return_counts=True)
+
+    return {
+        "year": list(range(1, max_t + 2)),
+        "trajectories": trajectories,
+        "full_cover_t": {
+            "percentiles": {f"p{p:g}": (int(v) if np.isfinite(v) else None) for p, v in zip(percentiles, cover_percentiles)},
+            "probability_within_horizon": float(np.mean(~np.isnan(full_cover_t))),
+            "histogram": {int(y): int(c) for y, c in zip(years, counts)},
+        },
+    }
@@ -0,0 +1,279 @@
+"""
+Precomputed /calculate answers over a grid of common inputs.
+
+The offline command evaluates the phase-out model (offset and no-offset) at every grid node and
+writes one .npy file per summary column, plus index.json with the grid axes and the constants the
+grid was built with:
+
+    python -m backend.precompute --out grid/ [--spec grid.json]
+
+where grid.json overrides any of the DEFAULT_GRID axes, e.g.
+    {"ages": [25, 30, 35, 40], "premium_ratio": [0.001, 0.002, 0.004]}
+
+The model scales linearly with life cover when premium, balance and contribution (salary x
+KiwiSaver rate) scale with it, so the grid is over those three as ratios to cover and stores
+results per dollar of cover. The API memory-maps the columns (API workers share the pages) and
+answers requests that land on a node exactly, or inside a cell whose relative interpolation error,
+measured at the cell centre at build time, is within the configured tolerance. Everything else
+falls through to the live calculation.
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.models import ProjectionRequest
+from backend.projection import INVESTMENT_RETURNS, summary_payload
+from backend.vectorized import calculator_phaseout_batch
+from backend.constants import *
+
+DEFAULT_GRID = {
+    "investment_types": ["growth", "balanced", "conservative"],
+    "ages": list(range(18, STOP_AGE)),
+    # Geometric spacing: the model bends most at small ratios
+    "premium_ratio": np.geomspace(2.5e-4, 0.02, 16).tolist(),
+    "balance_ratio": [0.0, *np.geomspace(0.005, 2.0, 39).tolist()],
+    "contribution_ratio": [0.0, *np.geomspace(0.002, 0.06, 23).tolist()],
+}
+
+# Interpolated axes (premium, KiwiSaver balance, salary contribution per dollar of cover),
+# in array order after (investment type, age)
+CONTINUOUS_AXES = ["premium_ratio", "balance_ratio", "contribution_ratio"]
+
+# Stored per node and per dollar of cover: everything summary_payload needs
+COLUMNS = ["total_savings", "kiwisaver_increase", "ks_end_without_offset"]
+
+
+def grid_constants() -> dict:
+    """Constants baked into the grid; a grid built with different values is refused at load."""
+    return {
+        "STOP_AGE": STOP_AGE,
+        "PREMIUM_ESCALATION": PREMIUM_ESCALATION,
+        "SALARY_INCREASE": SALARY_INCREASE,
+        "OFFSET_ALPHA": OFFSET_ALPHA,
+        "NO_OFFSET_ALPHA": NO_OFFSET_ALPHA,
+        "INVESTMENT_RETURNS": INVESTMENT_RETURNS,
+    }
+
+
+def _summaries(max_t: int, r_avg: float, P0, K0, S0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (n, len(COLUMNS)) summary columns for a unit of cover, for scenarios sharing a horizon and
+    return, and the first year each scenario starts fully offset (max_t + 1 if never).
+    """
+    args = dict(max_t=max_t, L=1.0, P0=P0, g=PREMIUM_ESCALATION, r_avg=r_avg, K0=K0, si=SALARY_INCREASE, S0=S0)
+    offset, full_cover_t = calculator_phaseout_batch(**args, alpha=OFFSET_ALPHA)
+    no_offset, _ = calculator_phaseout_batch(**args, alpha=NO_OFFSET_ALPHA)
+
+    ks_end_with_offset = offset["KiwiSaver End Balance"][:, -1]
+    ks_end_without_offset = no_offset["KiwiSaver End Balance"][:, -1]
+    summaries = np.stack([
+        no_offset["Baseline Premium"].sum(axis=1) - offset["Premium w/ Offset"].sum(axis=1),
+        ks_end_with_offset - ks_end_without_offset,
+        ks_end_without_offset,
+    ], axis=1)
+    offset_from = np.where(OFFSET_ALPHA * np.asarray(K0) >= 1.0, 0, np.nan_to_num(full_cover_t, nan=max_t + 1))
+    return summaries, offset_from
+
+
+def _pairs(values: np.ndarray, axis: int, reduce) -> np.ndarray:
+    """reduce() over each pair of neighbours along an axis (one shorter along it)."""
+    lo = [slice(None)] * values.ndim
+    hi = [slice(None)] * values.ndim
+    lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+    return reduce(values[tuple(lo)], values[tuple(hi)])
+
+
+def _cell_error(max_t: int, r_avg: float, axes: List[np.ndarray], at_nodes: np.ndarray,
+                offset_from: np.ndarray) -> np.ndarray:
+    """
+    Relative interpolation error estimate per cell. Where the first fully offset year is the same
+    at every corner it is the same throughout the cell (the balance rises with each input), the
+    model is smooth there, and the multilinear error is about the sum over axes of the error
+    halfway along each axis. That is measured at every edge midpoint, taking each cell's worst
+    edge per axis. Cells where the first fully offset year changes have a kink inside and are
+    never interpolated (error inf).
+    """
+    error = 0.0
+    for axis in range(len(axes)):
+        points = [0.5 * (a[:-1] + a[1:]) if i == axis else a for i, a in enumerate(axes)]
+        exact, _ = _summaries(max_t, r_avg, *(a.ravel() for a in np.meshgrid(*points, indexing="ij")))
+        exact = exact.reshape(tuple(len(a) for a in points) + (len(COLUMNS),))
+        difference = np.abs(_pairs(at_nodes, axis, lambda lo, hi: 0.5 * (lo + hi)) - exact)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = np.where(difference == 0.0, 0.0, difference / np.abs(exact)).max(axis=-1)
+        for other in range(len(axes)):
+            if other != axis:
+                relative = _pairs(relative, other, np.maximum)
+        error = error + relative
+
+    same_offset_year = offset_from
+    for axis in range(len(axes)):
+        same_offset_year = _pairs(same_offset_year, axis, lambda lo, hi: np.where(lo == hi, lo, np.nan))
+    return np.where(np.isnan(same_offset_year), np.inf, error)
+
+
+def build_grid(out_dir: str, grid: Optional[Dict[str, Sequence]] = None, progress: bool = True) -> dict:
+    """
+    Evaluate the grid, write the columns and index to out_dir and return build stats.
+    Alongside the columns, max_error.npy holds each cell's estimated relative interpolation
+    error (see _cell_error).
+    """
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    unknown = [name for name in grid if name not in DEFAULT_GRID]
+    if unknown:
+        raise ValueError(f"Unknown grid axes: {', '.join(unknown)}")
+    for name in CONTINUOUS_AXES:
+        grid[name] = sorted(float(v) for v in grid[name])
+        if len(grid[name]) < 2:
+            raise ValueError(f"Grid axis {name} needs at least two values")
+    grid["ages"] = sorted(int(age) for age in grid["ages"])
+    grid["investment_types"] = [name.lower() for name in grid["investment_types"]]
+
+    axes = [np.array(grid[name]) for name in CONTINUOUS_AXES]
+    nodes = [a.ravel() for a in np.meshgrid(*axes, indexing="ij")]
+    node_shape = tuple(len(a) for a in axes)
+    cell_shape = tuple(len(a) - 1 for a in axes)
+    outer_shape = (len(grid["investment_types"]), len(grid["ages"]))
+
+    os.makedirs(out_dir, exist_ok=True)
+    columns = [
+        np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+", shape=outer_shape + node_shape)
+        for name in COLUMNS
+    ]
+    max_error = np.lib.format.open_memmap(os.path.join(out_dir, "max_error.npy"), mode="w+",
+                                          shape=outer_shape + cell_shape)
+
+    started = time.perf_counter()
+    for i, investment_type in enumerate(grid["investment_types"]):
+        r_avg = INVESTMENT_RETURNS[investment_type]
+        for j, age in enumerate(grid["ages"]):
+            max_t = STOP_AGE - age
+            at_nodes, offset_from = _summaries(max_t, r_avg, *nodes)
+            at_nodes = at_nodes.reshape(node_shape + (len(COLUMNS),))
+            for k, column in enumerate(columns):
+                column[i, j] = at_nodes[..., k]
+            max_error[i, j] = _cell_error(max_t, r_avg, axes, at_nodes, offset_from.reshape(node_shape))
+            if progress:
+                print(f"\r{investment_type} age {age}", end="", file=sys.stderr, flush=True)
+
+    for column in columns:
+        column.flush()
+    max_error.flush()
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump({"axes": grid, "columns": COLUMNS, "constants": grid_constants()}, f, indent=2)
+
+    elapsed = time.perf_counter() - started
+    if progress:
+        print(file=sys.stderr)
+    return {
+        "nodes": int(np.prod(outer_shape + node_shape)),
+        "seconds": round(elapsed, 3),
+        "interpolable_cells": round(float(np.isfinite(max_error).mean()), 4),
+        "max_error_p50": float(np.median(max_error[np.isfinite(max_error)])),
+    }
+
+
+def grid_identity(path: str, max_error: float) -> str:
+    """
+    Stable digest of a grid's index, its cell error bounds and the error accepted, i.e. of which
+    approximate answers lookup gives. Persisted caches of grid answers are keyed on it.
+    """
+    digest = hashlib.sha256(repr(float(max_error)).encode())
+    for name in ("index.json", "max_error.npy"):
+        with open(os.path.join(path, name), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class PrecomputedGrid:
+    """
+    Read-only view of a grid written by build_grid. Columns are memory-mapped, so a lookup only
+    touches the 8 nodes around the request. max_error is the relative interpolation error allowed.
+    """
+
+    def __init__(self, path: str, max_error: float = 1e-3):
+        with open(os.path.join(path, "index.json")) as f:
+            index = json.load(f)
+        if index["constants"] != json.loads(json.dumps(grid_constants())):
+            raise ValueError(f"Precomputed grid at {path} was built with different constants; rebuild it")
+
+        self.max_error = max_error
+        self.axes = [index["axes"][name] for name in CONTINUOUS_AXES]
+        self.types = {name: i for i, name in enumerate(index["axes"]["investment_types"])}
+        self.ages = {age: i for i, age in enumerate(index["axes"]["ages"])}
+        # Plain ndarray views of the maps: same pages, without np.memmap's per-slice overhead
+        self.columns = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r").view(np.ndarray) for name in COLUMNS]
+        self.cell_error = np.load(os.path.join(path, "max_error.npy"), mmap_mode="r").view(np.ndarray)
+        self.identity = grid_identity(path, max_error)
+        self.exact = self.interpolated = self.misses = 0
+
+    def lookup(self, req: ProjectionRequest) -> Optional[dict]:
+        """The /calculate payload from the grid, or None if the request is off-grid or too far from a node."""
+        L = req.life_cover
+        t = self.types.get(req.investment_type.lower())
+        a = self.ages.get(req.current_age)
+        if t is None or a is None or L <= 0:
+            self.misses += 1
+            return None
+
+        point = (req.premium / L, req.kiwisaver_balance / L, req.salary * req.kiwisaver_rate / L)
+        cell, weights, on_node = [], [], True
+        for axis, x in zip(self.axes, point):
+            if not axis[0] <= x <= axis[-1]:
+                self.misses += 1
+                return None
+            i = min(bisect.bisect_right(axis, x) - 1, len(axis) - 2)
+            f = (x - axis[i]) / (axis[i + 1] - axis[i])
+            on_node = on_node and f in (0.0, 1.0)
+            cell.append(i)
+            weights.append((1.0 - f, f))
+
+        if not on_node and self.cell_error[t, a, cell[0], cell[1], cell[2]] > self.max_error:
+            self.misses += 1
+            return None
+
+        # Trilinear weights of the 8 corners, in the C order of the corner block
+        (i, j, k), (wi, wj, wk) = cell, weights
+        corner_weights = [x * y * z for x in wi for y in wj for z in wk]
+        values = [
+            L * sum(w * v for w, v in zip(corner_weights, column[t, a, i:i + 2, j:j + 2, k:k + 2].ravel().tolist()))
+            for column in self.columns
+        ]
+        if on_node:
+            self.exact += 1
+        else:
+            self.interpolated += 1
+
+        total_savings, total_ks_increase, ks_end_without_offset = values
+        return summary_payload(total_savings, total_ks_increase, ks_end_without_offset,
+                               STOP_AGE - req.current_age, req.investment_type)
+
+    def stats(self) -> dict:
+        return {"exact": self.exact, "interpolated": self.interpolated, "misses": self.misses,
+                "max_error": self.max_error}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute /calculate answers over a grid of common inputs")
+    parser.add_argument("--out", default="grid", help="output directory")
+    parser.add_argument("--spec", help="JSON file overriding any of the default grid axes")
+    args = parser.parse_args(argv)
+
+    grid = None
+    if args.spec:
+        with open(args.spec) as f:
+            grid = json.load(f)
+
+    print(json.dumps(build_grid(args.out, grid)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from typing import List, Tuple
+
+from backend.core import initial_required_cover, phaseout_summary
+from backend.models import ProjectionRequest, TotalWealthRequest
+from backend.constants import *
+
+INVESTMENT_RETURNS = {
+    "growth": GROWTH_INVESTMENT_RETURN,
+    "balanced": BALANCED_INVESTMENT_RETURN,
+    "conservative": CONSERVATIVE_INVESTMENT_RETURN,
+}
+
+INVESTMENT_VOLATILITIES = {
+    "growth": GROWTH_INVESTMENT_VOLATILITY,
+    "balanced": BALANCED_INVESTMENT_VOLATILITY,
+    "conservative": CONSERVATIVE_INVESTMENT_VOLATILITY,
+}
+
+
+def phaseout_inputs(req: ProjectionRequest, alpha: float = OFFSET_ALPHA) -> dict:
+    """calculator_phaseout arguments for a request."""
+    return dict(
+        max_t=STOP_AGE - req.current_age,
+        L=req.life_cover,
+        P0=req.premium,
+        g=PREMIUM_ESCALATION,
+        r_avg=INVESTMENT_RETURNS.get(req.investment_type.lower()),
+        K0=req.kiwisaver_balance,
+        si=SALARY_INCREASE,
+        S0=req.salary * req.kiwisaver_rate,
+        alpha=alpha
+    )
+
+
+def total_wealth_inputs(req: TotalWealthRequest) -> Tuple[dict, float]:
+    """
+    calculator_total_wealth arguments for a request, with the premium scaled to today's required cover.
+    Returns (arguments, today's required cover).
+    """
+    required_cover = initial_required_cover(
+        K0=req.kiwisaver_balance,
+        property_value=req.property_value,
+        cash=req.cash,
+        managed_funds=req.managed_funds,
+        other_assets=req.other_assets,
+        liabilities=req.liabilities,
+        child_ages=req.child_ages,
+        holding_amount=req.holding_amount,
+        funeral_cost=req.funeral_cost
+    )
+    baseline_premium = req.premium * (required_cover / req.life_cover) if req.life_cover > 0 else req.premium
+
+    inputs = dict(
+        max_t=STOP_AGE - req.current_age,
+        P0=baseline_premium,
+        g=PREMIUM_ESCALATION,
+        r_avg=INVESTMENT_RETURNS.get(req.investment_type.lower()),
+        K0=req.kiwisaver_balance,
+        si=SALARY_INCREASE,
+        S0=req.salary * req.kiwisaver_rate,
+        property_value=req.property_value,
+        cash=req.cash,
+        managed_funds=req.managed_funds,
+        other_assets=req.other_assets,
+        liabilities=req.liabilities,
+        child_ages=req.child_ages,
+        asset_growth_rate=req.asset_growth_rate,
+        debt_shrink_rate=req.debt_shrink_rate,
+        holding_amount=req.holding_amount,
+        funeral_cost=req.funeral_cost,
+        periods=req.periods
+    )
+    return inputs, required_cover
+
+
+def summarise_projection(req: ProjectionRequest) -> dict:
+    """
+    Summary stats for one client without building the year-by-year tables.
+    Returns the same payload as /calculate.
+    """
+    max_t = STOP_AGE - req.current_age
+    S0 = req.salary * req.kiwisaver_rate
+    selected_return = INVESTMENT_RETURNS.get(req.investment_type.lower())
+
+    # Offset and no-offset scenarios in a single summary-only pass
+    summary = phaseout_summary(
+        max_t=max_t,
+        L=req.life_cover,
+        P0=req.premium,
+        g=PREMIUM_ESCALATION,
+        r_avg=selected_return,
+        K0=req.kiwisaver_balance,
+        si=SALARY_INCREASE,
+        S0=S0,
+        alpha=OFFSET_ALPHA,
+        baseline_alpha=NO_OFFSET_ALPHA
+    )
+
+    return summary_payload(
+        total_savings=summary.total_premium_without_offset - summary.total_premium_with_offset,
+        total_ks_increase=summary.ks_end_with_offset - summary.ks_end_without_offset,
+        ks_end_without_offset=summary.ks_end_without_offset,
+        max_t=max_t,
+        investment_type=req.investment_type
+    )
+
+
+def summarise_many(reqs: List[ProjectionRequest]) -> List[dict]:
+    """summarise_projection over a list; one picklable call per chunk for the process pool."""
+    return [summarise_projection(req) for req in reqs]
+
+
+def summary_payload(total_savings: float,
+                    total_ks_increase: float,
+                    ks_end_without_offset: float,
+                    max_t: int,
+                    investment_type: str) -> dict:
+    """The /calculate response from the offset vs no-offset differences."""
+    ks_increase_pct = ((total_ks_increase / ks_end_without_offset) * 100) if ks_end_without_offset > 0 else 0
+    per_year_true_cost = total_ks_increase / max(1, max_t)
+
+    return {
+        "total_savings": max(0, round(total_savings, 2)),
+        "kiwisaver_increase": max(0, round(total_ks_increase, 2)),
+        "kiwisaver_increase_pct": round(ks_increase_pct, 2),
+        "true_cost_per_year": max(0, round(per_year_true_cost, 2)),
+        "investment_type": investment_type,
+    }
@@ -0,0 +1,71 @@
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+
+@lru_cache(maxsize=None)
+def _layout(columns: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    """Column tuple and name -> row index, one pair per column set, shared by every result using it."""
+    return columns, {name: i for i, name in enumerate(columns)}
+
+
+class ProjectionResult:
+    """
+    Year-by-year projection table stored as one contiguous float64 block of shape
+    (columns, years), so each column is a contiguous view and nothing is boxed per row.
+    pandas and pyarrow are only imported when converting to their types. columns and the
+    column index are shared by all results with the same columns, and never mutated.
+    """
+    __slots__ = ("columns", "values", "full_cover_t", "_index")
+
+    def __init__(self, columns: Sequence[str], n_years: int, full_cover_t: Optional[int] = None):
+        self.columns, self._index = _layout(tuple(columns))
+        self.values = np.empty((len(self.columns), n_years))
+        self.full_cover_t = full_cover_t
+
+    def __len__(self) -> int:
+        return self.values.shape[1]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.values[self._index[column]]
+
+    def __repr__(self) -> str:
+        return f"ProjectionResult(years={len(self)}, columns={len(self.columns)}, full_cover_t={self.full_cover_t})"
+
+    # ------------------ Summaries (no table materialised) ------------------
+    def total(self, column: str) -> float:
+        return float(self[column].sum())
+
+    def final(self, column: str) -> float:
+        return float(self[column][-1])
+
+    @property
+    def final_balance(self) -> float:
+        return self.final("KiwiSaver End Balance")
+
+    # ------------------ Conversions ------------------
+    def to_numpy(self) -> np.ndarray:
+        """The underlying (columns, years) array itself (no copy)."""
+        return self.values
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        """Column name -> array view (no copy)."""
+        return {name: self.values[i] for i, name in enumerate(self.columns)}
+
+    def to_arrow(self):
+        """pyarrow Table; float columns wrap the existing buffers, "year" is cast to int64."""
+        import pyarrow as pa
+
+        return pa.table({
+            name: pa.array(self[name].astype(np.int64) if name == "year" else self[name])
+            for name in self.columns
+        })
+
+    def to_dataframe(self):
+        """pandas DataFrame with the same columns and dtypes as the original calculator output."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            name: self[name].astype(np.int64) if name == "year" else self[name]
+            for name in self.columns
+        })
@@ -0,0 +1,88 @@
+"""
+Production entry point for the API.
+
+    python -m backend.serve --workers 4 --shared-cache cache.sqlite3
+
+runs several uvicorn worker processes, so concurrent requests are spread over cores instead of
+queuing behind one interpreter's GIL. --pool-workers additionally moves the CPU-bound handlers
+(Monte Carlo, total wealth, solve, batch) of each worker into its own process pool; that helps
+when there are spare cores beyond the uvicorn workers, e.g. one event loop feeding a pool.
+--shared-cache puts a SQLite tier behind each worker's /calculate cache so a result computed by
+one worker is reused by the rest.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+import uvicorn
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """
+    Listening socket shared by the workers. asyncio only sets TCP_NODELAY on connections whose
+    socket reports IPPROTO_TCP, and uvicorn's own multi-worker socket doesn't, which adds a
+    ~40ms delayed-ACK stall to every keep-alive response; so the protocol is given explicitly.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(host: str, port: int, sock: socket.socket):
+    config = uvicorn.Config("backend.api:app", host=host, port=port, log_level="warning")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def run_workers(host: str, port: int, workers: int):
+    """Serve on one socket from `workers` processes, restarting any that exit until interrupted."""
+    sock = bind_socket(host, port)
+    if workers <= 1:
+        _worker(host, port, sock)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+
+    processes = []
+    while not stopping.is_set():
+        processes = [p for p in processes if p.is_alive()]
+        while len(processes) < workers:
+            process = context.Process(target=_worker, args=(host, port, sock), daemon=False)
+            process.start()
+            processes.append(process)
+        stopping.wait(timeout=1)
+
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="uvicorn worker processes")
+    parser.add_argument("--pool-workers", type=int, default=0,
+                        help="CPU offload processes per uvicorn worker (0 = compute in the worker)")
+    parser.add_argument("--shared-cache", help="SQLite file for the cross-worker /calculate cache")
+    args = parser.parse_args(argv)
+
+    # Workers are separate processes that import backend.api themselves, so settings go via the environment
+    os.environ["API_POOL_WORKERS"] = str(args.pool_workers)
+    if args.shared_cache:
+        os.environ["PROJECTION_SHARED_CACHE"] = args.shared_cache
+
+    run_workers(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
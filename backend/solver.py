@@ -0,0 +1,153 @@
+import itertools
+import math
+from typing import Callable, NamedTuple, Optional
+
+from backend.core import PHASEOUT_COLUMNS, _phaseout_steps
+
+SOLVABLE = ("kiwisaver_rate", "kiwisaver_balance", "premium")
+
+# First upper bracket tried, grown 4x per step up to UPPER_LIMITS
+INITIAL_GUESSES = {
+    "kiwisaver_rate": 0.03,
+    "kiwisaver_balance": 10_000.0,
+    "premium": 1_000.0,
+}
+
+# Largest value tried when bracketing; past this the target is reported as unreachable
+UPPER_LIMITS = {
+    "kiwisaver_rate": 1.0,
+    "kiwisaver_balance": 1e9,
+    "premium": 1e7,
+}
+
+_BALANCE = PHASEOUT_COLUMNS.index("KiwiSaver End Balance")
+
+
+class SolveResult(NamedTuple):
+    value: Optional[float]
+    evaluations: int
+    feasible: bool
+
+
+def brentq(f: Callable[[float], float], a: float, b: float, fa: float, fb: float,
+           xtol: float = 1e-6, maxiter: int = 100) -> float:
+    """
+    Brent's method for a root of f bracketed by [a, b] (fa and fb already evaluated, opposite signs).
+    Inverse quadratic / secant steps with a bisection fallback, so convergence is guaranteed.
+    """
+    if fa == 0.0:
+        return a
+    if fb == 0.0:
+        return b
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(maxiter):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2e-16 * abs(b) + 0.5 * xtol
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0.0:
+            return b
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p, q = 2.0 * m * s, 1.0 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2.0 * m * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2.0 * p < min(3.0 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = f(b)
+    return b
+
+
+def solve_phaseout(solve_for: str,
+                   max_t: int,
+                   L: float,
+                   P0: float,
+                   g: float,
+                   r_avg: float,
+                   K0: float,
+                   si: float,
+                   salary: float,
+                   kiwisaver_rate: float,
+                   alpha: float = 1.0,
+                   target_t: Optional[int] = None,
+                   target_balance: Optional[float] = None,
+                   decimals: Optional[int] = None) -> SolveResult:
+    """
+    Smallest value of one input (kiwisaver_rate, kiwisaver_balance or premium) that makes the
+    phase-out projection reach full cover by year target_t, or end with target_balance.
+
+    The KiwiSaver balance in any given year rises with each of these inputs, so the target is
+    recast as a root of (balance in the target year - L, or final balance - target) and found
+    with Brent's method after bracketing upwards from 0. The answer is the smallest value on the
+    `decimals` grid (6 places for a rate, cents otherwise) that still meets the target.
+    """
+    if solve_for not in SOLVABLE:
+        raise ValueError(f"solve_for must be one of {', '.join(SOLVABLE)}")
+    if (target_t is None) == (target_balance is None):
+        raise ValueError("Give exactly one of target_t or target_balance")
+
+    if target_t is not None:
+        year, goal = min(max(1, target_t), max_t + 1), L
+    else:
+        year, goal = max_t + 1, target_balance
+
+    evaluations = 0
+
+    def f(x: float) -> float:
+        nonlocal evaluations
+        evaluations += 1
+        inputs = {"kiwisaver_rate": kiwisaver_rate, "kiwisaver_balance": K0, "premium": P0, solve_for: x}
+        steps = _phaseout_steps(year - 1, L, inputs["premium"], g, r_avg, inputs["kiwisaver_balance"], si,
+                                salary * inputs["kiwisaver_rate"], alpha)
+        # The balance only grows from year to year, so reaching goal by `year` means reaching it in `year`
+        last = next(itertools.islice(steps, year - 1, None))
+        return last[_BALANCE] - goal
+
+    lo, f_lo = 0.0, f(0.0)
+    if f_lo >= 0:
+        return SolveResult(0.0, evaluations, True)
+
+    limit = UPPER_LIMITS[solve_for]
+    hi = INITIAL_GUESSES[solve_for]
+    f_hi = f(hi)
+    while f_hi < 0:
+        if hi >= limit:
+            return SolveResult(None, evaluations, False)
+        lo, f_lo = hi, f_hi
+        hi = min(hi * 4, limit)
+        f_hi = f(hi)
+
+    if decimals is None:
+        decimals = 6 if solve_for == "kiwisaver_rate" else 2
+    step = 10.0**-decimals
+    value = brentq(f, lo, hi, f_lo, f_hi, xtol=step)
+
+    # Round up onto the reaching side of the root so the reported answer meets the target. brentq
+    # only pins the root to within about a step, so then step back while the value below also does
+    value = math.ceil(round(value / step, 6)) / 10**decimals
+    while f(value) < 0:
+        value = round(value + step, decimals)
+    while value > lo and f(round(value - step, decimals)) >= 0:
+        value = round(value - step, decimals)
+    return SolveResult(value, evaluations, True)
@@ -0,0 +1,199 @@
+"""
+Sensitivity sweeps over calculator_total_wealth.
+
+Every combination of the grid values is run against a base set of inputs. Cells are sharded
+across a process pool in chunks, and results are streamed to CSV (or Parquet when pyarrow is
+installed) as each chunk completes.
+
+    python -m backend.sweep sweep.json --out sweep.csv --workers 8
+
+where sweep.json looks like
+    {"grid": {"asset_growth_rate": [0.03, 0.05], "debt_shrink_rate": [0.03, 0.05],
+              "r_avg": [0.06, 0.08, 0.10], "g": [0.03, 0.05]},
+     "base": {"max_t": 44, "P0": 1800}}
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from backend.core import project_total_wealth
+
+# Defaults match the Streamlit app's inputs; anything in "base" or "grid" overrides them
+DEFAULT_BASE = {
+    "max_t": 44,
+    "P0": 1_800.0,
+    "g": 0.03,
+    "r_avg": 0.05011,
+    "K0": 100_000.0,
+    "si": 0.03,
+    "S0": 2_400.0,
+    "property_value": 200_000.0,
+    "cash": 50_000.0,
+    "managed_funds": 100_000.0,
+    "other_assets": 20_000.0,
+    "liabilities": 600_000.0,
+    "child_ages": [],
+    "asset_growth_rate": 0.0501,
+    "debt_shrink_rate": 0.0501,
+    "holding_amount": 200_000.0,
+    "funeral_cost": 100_000.0,
+}
+
+RESULT_COLUMNS = [
+    "full_cover_t",
+    "starting_required_cover",
+    "total_premium_with_offset",
+    "total_baseline_premium",
+    "kiwisaver_end_balance",
+    "total_assets_end",
+]
+
+
+def iter_cells(grid: Dict[str, Sequence]) -> Iterator[tuple]:
+    """All combinations of the grid values, in the order of the grid's keys."""
+    return itertools.product(*grid.values())
+
+
+def _run_chunk(base: dict, names: List[str], start: int, cells: List[tuple]) -> List[list]:
+    rows = []
+    for offset, values in enumerate(cells):
+        params = dict(base, **dict(zip(names, values)))
+        result = project_total_wealth(**params)
+        rows.append([
+            start + offset,
+            *values,
+            result.full_cover_t,
+            float(result["Required Cover"][0]),
+            result.total("Premium w/ Offset"),
+            result.total("Baseline Premium"),
+            result.final_balance,
+            result.final("Total Assets"),
+        ])
+    return rows
+
+
+class _CsvSink:
+    def __init__(self, path: str, header: List[str]):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write(self, rows: List[list]):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path: str, header: List[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._header = header
+        self._writer = None
+        self._path = path
+        self._pq = pq
+
+    def write(self, rows: List[list]):
+        # One row group per completed chunk
+        table = self._pa.Table.from_pylist([dict(zip(self._header, row)) for row in rows])
+        if self._writer is None:
+            # Pin the dtypes so the first chunk can't fix them: all-None full_cover_t would make the
+            # column null, and a grid axis written as [0, 0.02, 0.05] would make it int64
+            pa = self._pa
+            fixed = {"cell": pa.int64(), "full_cover_t": pa.int64()}
+            fixed.update((name, pa.float64()) for name in RESULT_COLUMNS if name not in fixed)
+            fixed.update(
+                (name, pa.int64() if isinstance(value, int) else pa.float64())
+                for name, value in DEFAULT_BASE.items() if isinstance(value, (int, float))
+            )
+            schema = pa.schema([pa.field(f.name, fixed.get(f.name, f.type)) for f in table.schema])
+            self._writer = self._pq.ParquetWriter(self._path, schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run_sweep(grid: Dict[str, Sequence],
+              out_path: str,
+              base: Optional[dict] = None,
+              workers: Optional[int] = None,
+              chunk_size: int = 256,
+              progress: bool = True) -> dict:
+    """
+    Run calculator_total_wealth over every cell of the grid and stream summary rows to out_path
+    (.parquet needs pyarrow, anything else is written as CSV). Rows are written in completion
+    order; the "cell" column is the cell's index in grid order.
+    Returns run stats (cells, seconds, cells_per_sec).
+    """
+    base = dict(DEFAULT_BASE, **(base or {}))
+    names = list(grid)
+    unknown = [name for name in names if name not in DEFAULT_BASE]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(unknown)}")
+
+    total = 1
+    for values in grid.values():
+        total *= len(values)
+
+    header = ["cell", *names, *RESULT_COLUMNS]
+    sink = _ParquetSink(out_path, header) if out_path.endswith(".parquet") else _CsvSink(out_path, header)
+
+    done = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            cells = iter_cells(grid)
+            start = 0
+            while True:
+                chunk = list(itertools.islice(cells, chunk_size))
+                if not chunk:
+                    break
+                futures.append(pool.submit(_run_chunk, base, names, start, chunk))
+                start += len(chunk)
+
+            for future in as_completed(futures):
+                rows = future.result()
+                sink.write(rows)
+                done += len(rows)
+                if progress:
+                    elapsed = time.perf_counter() - started
+                    print(f"\r{done}/{total} cells  {done / elapsed:,.0f} cells/sec", end="", file=sys.stderr, flush=True)
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - started
+    if progress:
+        print(file=sys.stderr)
+    return {"cells": done, "seconds": round(elapsed, 3), "cells_per_sec": round(done / elapsed, 1) if elapsed else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sensitivity sweep over calculator_total_wealth")
+    parser.add_argument("spec", help='JSON file with "grid" (parameter -> list of values) and optional "base"')
+    parser.add_argument("--out", default="sweep.csv", help="output path (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+
+    stats = run_sweep(spec["grid"], args.out, base=spec.get("base"), workers=args.workers, chunk_size=args.chunk_size)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
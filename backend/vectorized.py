@@ -0,0 +1,103 @@
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from backend.core import PHASEOUT_COLUMNS
+
+
+def calculator_phaseout_batch(max_t,
+                              L,
+                              P0,
+                              g,
+                              r_avg,
+                              K0,
+                              si,
+                              S0,
+                              alpha=1.0,
+                              columns: Optional[Sequence[str]] = None) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Vectorised calculator_phaseout: steps every scenario together, one year at a time.
+    Each argument is a scalar or a length-n array (broadcast against each other). r_avg may
+    also be an (n, years) array of per-year returns.
+    Returns a dict of (n, max(max_t)+1) arrays keyed like the calculator_phaseout columns, with
+    NaN past each scenario's own horizon, and the full-cover year per scenario (NaN if never).
+    columns limits the output to those columns; the others are computed but not stored, which
+    keeps memory down for large n.
+    """
+    r_avg = np.asarray(r_avg, dtype=float)
+    per_year_returns = r_avg.ndim == 2
+    # A per-year return matrix also fixes the scenario count (e.g. Monte Carlo paths)
+    scenarios = np.empty(r_avg.shape[0]) if per_year_returns else np.atleast_1d(r_avg)
+
+    max_t, L, P0, g, K0, si, S0, alpha, _ = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (max_t, L, P0, g, K0, si, S0, alpha)),
+        scenarios
+    )
+    n = max_t.shape[0]
+    horizon = max_t.astype(int)
+    n_years = int(horizon.max()) + 1 if n else 0
+
+    if not per_year_returns:
+        r_avg = np.broadcast_to(r_avg, (n,))
+    elif r_avg.shape[1] < n_years:
+        raise ValueError(f"r_avg has {r_avg.shape[1]} years of returns, need {n_years}")
+
+    columns = PHASEOUT_COLUMNS if columns is None else list(columns)
+    unknown = [col for col in columns if col not in PHASEOUT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+    # Year-major buffers so each year's write is contiguous; returned transposed as (n, years)
+    out = {col: np.full((n_years, n), np.nan) for col in columns}
+    full_cover_t = np.full(n, np.nan)
+
+    has_cover = L > 0
+    safe_L = np.where(has_cover, L, 1.0)
+    Kt = K0.copy()
+
+    for t in range(n_years):
+        active = t <= horizon
+        all_active = active.all()
+        r_t = r_avg[:, t] if per_year_returns else r_avg
+
+        Pt = P0 * (1.0 + g)**t
+
+        Ot = np.minimum(alpha * Kt, L)
+        Et = np.maximum(0.0, L - Ot)
+
+        P_off_t = np.where(has_cover, Pt * (Et / safe_L), 0.0)
+        dPt = Pt - P_off_t
+        Vt = dPt
+
+        St = S0 * (1.0 + si)**t
+        avg_capital_base = Kt + 0.5 * (St + Vt)
+        return_t = r_t * avg_capital_base
+
+        Kt1 = Kt + St + Vt + return_t
+
+        for col, values in (
+            ("year", t + 1),
+            ("KiwiSaver Start Balance", Kt),
+            ("Baseline Premium", Pt),
+            ("Offset", Ot),
+            ("Effective Cover", Et),
+            ("Premium w/ Offset", P_off_t),
+            ("Premium Saving", dPt),
+            ("Voluntary Contribution", Vt),
+            ("Annual Salary Contribution", St),
+            ("Annual Investment Return", return_t),
+            ("KiwiSaver End Balance", Kt1),
+        ):
+            if col not in out:
+                continue
+            if all_active:
+                out[col][t] = values
+            else:
+                out[col][t, active] = np.broadcast_to(values, (n,))[active]
+
+        newly_covered = active & (Kt1 >= L) & np.isnan(full_cover_t)
+        full_cover_t[newly_covered] = t + 1
+
+        # Scenarios past their horizon keep their final balance
+        Kt = np.where(active, Kt1, Kt)
+
+    return {col: values.T for col, values in out.items()}, full_cover_t
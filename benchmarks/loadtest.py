@@ -0,0 +1,129 @@
+"""
+Load test: starts a local server (backend/serve.py) for each worker count and measures
+requests/sec under concurrent clients.
+
+    python -m benchmarks.loadtest --workers 1 2 4 --endpoint total-wealth --clients 16 --seconds 10
+
+Every request has a different premium so the /calculate cache can't answer it. Clients run in
+their own processes on the same machine as the server, so leave cores for them: scaling flattens
+once server workers plus clients exceed the core count.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+CLIENT = dict(current_age=30, life_cover=500_000, premium=1_800, kiwisaver_balance=100_000,
+              salary=80_000, kiwisaver_rate=0.03, investment_type="balanced")
+
+ENDPOINTS = {
+    "calculate": ("/calculate", CLIENT),
+    "total-wealth": ("/calculate/total-wealth", dict(CLIENT, property_value=200_000, cash=50_000,
+                                                     liabilities=600_000, child_ages=[3, 6],
+                                                     holding_amount=200_000, funeral_cost=100_000)),
+    "montecarlo": ("/calculate/montecarlo", dict(CLIENT, n_paths=2_000)),
+    "solve": ("/solve", dict(CLIENT, solve_for="kiwisaver_rate", target_age=50)),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, pool_workers: int, shared_cache: str) -> subprocess.Popen:
+    env = dict(os.environ, JOBS_DB_PATH=os.path.join(tempfile.gettempdir(), f"loadtest_jobs_{port}.sqlite3"))
+    args = [sys.executable, "-m", "backend.serve", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--pool-workers", str(pool_workers)]
+    if shared_cache:
+        args += ["--shared-cache", shared_cache]
+    server = subprocess.Popen(args, env=env)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/cache/stats")
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+def _client(port: int, path: str, body: dict, seconds: float, seed: int) -> List[float]:
+    """One keep-alive connection sending requests back to back; returns latencies (NaN = error)."""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        payload = json.dumps(dict(body, premium=round(rng.uniform(500, 5_000), 2)))
+        started = time.perf_counter()
+        try:
+            conn.request("POST", path, payload, headers)
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started if response.status == 200 else float("nan"))
+        except OSError:
+            latencies.append(float("nan"))
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    return latencies
+
+
+def run_load(port: int, endpoint: str, clients: int, seconds: float) -> dict:
+    path, body = ENDPOINTS[endpoint]
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        results = pool.starmap(_client, [(port, path, body, seconds, seed) for seed in range(clients)])
+
+    latencies = sorted(x for result in results for x in result if x == x)
+    errors = sum(1 for result in results for x in result if x != x)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / seconds, 1),
+        "p50_ms": round(latencies[count // 2] * 1e3, 2) if count else None,
+        "p99_ms": round(latencies[min(count - 1, int(count * 0.99))] * 1e3, 2) if count else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Requests/sec against a local server per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pool-workers", type=int, default=0)
+    parser.add_argument("--shared-cache", help="SQLite path for the cross-worker cache")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="total-wealth")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured load first, while all workers start")
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} cores, {args.clients} clients, {args.endpoint}, {args.seconds:.0f}s per run")
+    print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        port = _free_port()
+        server = start_server(workers, port, args.pool_workers, args.shared_cache)
+        try:
+            run_load(port, args.endpoint, args.clients, args.warmup)
+            stats = run_load(port, args.endpoint, args.clients, args.seconds)
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{workers:>8} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>9} "
+              f"{stats['p50_ms']:>8} {stats['p99_ms']:>8}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
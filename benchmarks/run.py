@@ -0,0 +1,206 @@
+"""
+Benchmarks for the calculator and API hot paths.
+
+    python -m benchmarks.run                 # run everything and print ops/sec
+    python -m benchmarks.run --record        # ...and append the results to the history file
+    python -m benchmarks.run --compare       # fail (exit 1) if any case is slower than the last record
+    python -m benchmarks.run -k total_wealth # only cases whose name contains the filter
+
+Numbers are only comparable on the same machine, so keep one history file per machine.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from backend import calculator
+from backend.constants import *
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), "history.json")
+
+PHASEOUT_ARGS = dict(L=500_000.0, P0=1_800.0, g=PREMIUM_ESCALATION, r_avg=BALANCED_INVESTMENT_RETURN,
+                     K0=100_000.0, si=SALARY_INCREASE, S0=2_400.0)
+
+TOTAL_WEALTH_ARGS = dict(P0=1_800.0, g=PREMIUM_ESCALATION, r_avg=BALANCED_INVESTMENT_RETURN, K0=100_000.0,
+                         si=SALARY_INCREASE, S0=2_400.0, property_value=200_000.0, cash=50_000.0,
+                         managed_funds=100_000.0, other_assets=20_000.0, liabilities=600_000.0,
+                         asset_growth_rate=ASSET_GROWTH_RATE, debt_shrink_rate=DEBT_SHRINK_RATE,
+                         holding_amount=200_000.0, funeral_cost=100_000.0)
+
+REQUEST = dict(current_age=30, life_cover=500_000, premium=1_800, kiwisaver_balance=100_000,
+               salary=80_000, kiwisaver_rate=0.03)
+
+
+def scalar_cases() -> List[Tuple[str, Callable[[], object]]]:
+    cases = []
+    for max_t in (10, 45, 65):
+        cases.append((f"phaseout[t={max_t}]", lambda max_t=max_t: calculator.calculator_phaseout(max_t=max_t, **PHASEOUT_ARGS)))
+        cases.append((f"phaseout_summary[t={max_t}]", lambda max_t=max_t: calculator.phaseout_summary(max_t=max_t, **PHASEOUT_ARGS)))
+    for max_t in (10, 45, 65):
+        for children in (0, 5, 20):
+            child_ages = list(range(0, 2 * children, 2))
+            cases.append((
+                f"total_wealth[t={max_t},children={children}]",
+                lambda max_t=max_t, child_ages=child_ages: calculator.calculator_total_wealth(
+                    max_t=max_t, child_ages=child_ages, **TOTAL_WEALTH_ARGS)
+            ))
+    return cases
+
+
+def batch_cases() -> List[Tuple[str, Callable[[], object]]]:
+    from backend.montecarlo import simulate_phaseout
+    from backend.vectorized import calculator_phaseout_batch
+
+    rng = np.random.default_rng(0)
+    n = 10_000
+    max_t = rng.integers(0, 65, n)
+    K0 = rng.uniform(0, 300_000, n)
+    args = dict(PHASEOUT_ARGS, K0=K0)
+    return [
+        ("phaseout_batch[n=10000]", lambda: calculator_phaseout_batch(max_t=max_t, **args)),
+        ("montecarlo[paths=10000,t=45]", lambda: simulate_phaseout(
+            max_t=45, L=500_000.0, P0=1_800.0, g=PREMIUM_ESCALATION, K0=100_000.0, si=SALARY_INCREASE,
+            S0=2_400.0, mean=BALANCED_INVESTMENT_RETURN, volatility=BALANCED_INVESTMENT_VOLATILITY, seed=0)),
+    ]
+
+
+def parallel_cases() -> List[Tuple[str, Callable[[], object]]]:
+    from backend.sweep import run_sweep
+
+    grid = {"asset_growth_rate": [0.03, 0.05], "debt_shrink_rate": [0.03, 0.05], "r_avg": [0.06, 0.08, 0.10],
+            "g": [0.03, 0.05]}
+    out_path = os.path.join(tempfile.gettempdir(), "benchmark_sweep.csv")
+    return [
+        ("sweep[cells=24,workers=2]", lambda: run_sweep(grid, out_path, workers=2, chunk_size=6, progress=False)),
+    ]
+
+
+def api_cases() -> List[Tuple[str, Callable[[], object]]]:
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError):
+        print("skipping API benchmarks (fastapi.testclient needs httpx)", file=sys.stderr)
+        return []
+    from backend import api
+
+    client = TestClient(api.app)
+    batch = [dict(REQUEST, current_age=age) for age in range(20, 60)] * 25
+
+    def uncached():
+        maxsize, api.projection_cache.maxsize = api.projection_cache.maxsize, 0
+        try:
+            return client.post("/calculate", json=REQUEST)
+        finally:
+            api.projection_cache.maxsize = maxsize
+
+    return [
+        ("api /calculate", uncached),
+        ("api /calculate (cached)", lambda: client.post("/calculate", json=REQUEST)),
+        ("api /calculate/batch[n=1000]", lambda: client.post("/calculate/batch", json=batch)),
+        ("api /calculate/total-wealth", lambda: client.post("/calculate/total-wealth", json=dict(
+            REQUEST, liabilities=600_000, property_value=200_000, child_ages=[3, 7]))),
+    ]
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, repeats: int = 5) -> float:
+    """Best-of-repeats throughput in calls/sec, with the loop count auto-ranged to min_time."""
+    fn()
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return number / best
+
+
+def run(name_filter: str = "") -> Dict[str, float]:
+    results = {}
+    for group in (scalar_cases, batch_cases, parallel_cases, api_cases):
+        for name, fn in group():
+            if name_filter not in name:
+                continue
+            results[name] = measure(fn)
+            print(f"{name:<45} {results[name]:>14,.1f} ops/sec")
+    return results
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def record(results: Dict[str, float], path: str):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+
+    history = load_history(path)
+    history.append({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "results": {name: round(ops, 2) for name, ops in results.items()},
+    })
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+
+
+def compare(results: Dict[str, float], history: list, threshold: float) -> List[str]:
+    """Cases whose throughput fell more than threshold (a fraction) below the latest recorded run."""
+    if not history:
+        return []
+    baseline = history[-1]["results"]
+    regressions = []
+    for name, ops in results.items():
+        if name in baseline and ops < baseline[name] * (1 - threshold):
+            regressions.append(f"{name}: {ops:,.1f} ops/sec vs {baseline[name]:,.1f} ({ops / baseline[name] - 1:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the calculator and API hot paths")
+    parser.add_argument("-k", dest="name_filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--record", action="store_true", help="append results to the history file")
+    parser.add_argument("--compare", action="store_true", help="fail if slower than the last recorded run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown for --compare (default 0.2 = 20%%)")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    args = parser.parse_args(argv)
+
+    results = run(args.name_filter)
+
+    regressions = compare(results, load_history(args.history), args.threshold) if args.compare else []
+    if args.record:
+        record(results, args.history)
+
+    if regressions:
+        print("\nThroughput regressions:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
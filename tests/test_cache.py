@@ -0,0 +1,122 @@
+import pytest
+
+from backend import cache
+from backend.cache import ProjectionCache, SharedCache, request_key
+from backend.models import ProjectionRequest
+from backend.precompute import PrecomputedGrid, build_grid
+from backend.projection import summarise_projection
+
+REQUEST = ProjectionRequest(current_age=30, life_cover=500_000, premium=1_773.36, kiwisaver_balance=4_025.17,
+                            salary=80_000, kiwisaver_rate=0.0127)
+
+# One cell around REQUEST, so its answer is interpolated
+SMALL_GRID = {
+    "investment_types": ["balanced"],
+    "ages": [30],
+    "premium_ratio": [0.003, 0.004],
+    "balance_ratio": [0.0075, 0.0085],
+    "contribution_ratio": [0.0019, 0.0022],
+}
+
+
+@pytest.fixture(scope="module")
+def grid_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("grid")
+    build_grid(str(path), SMALL_GRID, progress=False)
+    return str(path)
+
+
+def test_grid_answers_are_not_served_without_the_grid(grid_path, tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    grid = PrecomputedGrid(grid_path, max_error=1.0)
+    approximate = grid.lookup(REQUEST)
+    assert grid.interpolated == 1 and approximate != summarise_projection(REQUEST)
+
+    SharedCache(db, variant=f"grid-{grid.identity}").set(request_key(REQUEST), approximate)
+    assert SharedCache(db, variant=f"grid-{grid.identity}").get(request_key(REQUEST)) == approximate
+
+    # Restarted without the grid: the approximation must not be served
+    live = SharedCache(db)
+    assert live.get(request_key(REQUEST)) is None
+    assert live.stats()["size"] == 0
+
+
+def test_grid_identity_covers_max_error(grid_path):
+    assert PrecomputedGrid(grid_path, max_error=1e-3).identity == PrecomputedGrid(grid_path, max_error=1e-3).identity
+    assert PrecomputedGrid(grid_path, max_error=1e-3).identity != PrecomputedGrid(grid_path, max_error=1e-2).identity
+
+
+def test_entries_survive_reopening(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    SharedCache(db).set(request_key(REQUEST), {"total_savings": 1.0})
+    reopened = SharedCache(db)
+    assert reopened.get(request_key(REQUEST)) == {"total_savings": 1.0}
+    assert reopened.stats()["hit_rate"] == 1.0
+
+
+class Counter:
+    """compute callables for the cache that record how often each key was computed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key):
+        def compute():
+            self.calls.append(key)
+            return {"key": key}
+        return compute
+
+
+def test_lru_evicts_least_recently_used():
+    lru, compute = ProjectionCache(maxsize=2), Counter()
+    lru.get_or_compute("a", compute("a"))
+    lru.get_or_compute("b", compute("b"))
+    assert lru.get_or_compute("a", compute("a")) == {"key": "a"}   # "a" is now the most recent
+    lru.get_or_compute("c", compute("c"))                            # evicts "b"
+    lru.get_or_compute("a", compute("a"))
+    lru.get_or_compute("b", compute("b"))
+
+    assert compute.calls == ["a", "b", "c", "b"]
+    stats = lru.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 4, 2)
+    assert stats["hit_rate"] == round(2 / 6, 4)
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl, compute = ProjectionCache(maxsize=10, ttl=60), Counter()
+    ttl.get_or_compute("a", compute("a"))
+    now[0] += 59
+    ttl.get_or_compute("a", compute("a"))
+    now[0] += 2
+    ttl.get_or_compute("a", compute("a"))
+
+    assert compute.calls == ["a", "a"]
+    stats = ttl.stats()
+    # The expired entry counts as an eviction, and the recomputed value replaces it
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 2, 1)
+
+
+def test_maxsize_zero_disables_caching():
+    off, compute = ProjectionCache(maxsize=0), Counter()
+    for _ in range(3):
+        assert off.get_or_compute("a", compute("a")) == {"key": "a"}
+    assert off.warm([("b", compute("b"))]) == 1
+
+    assert compute.calls == ["a", "a", "a", "b"]
+    stats = off.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (0, 0, 0, 0)
+
+
+def test_local_misses_read_the_shared_tier(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    compute = Counter()
+    ProjectionCache(shared=SharedCache(db)).get_or_compute("a", compute("a"))
+    restarted = ProjectionCache(shared=SharedCache(db))
+    assert restarted.get_or_compute("a", compute("a")) == {"key": "a"}
+    assert restarted.get_or_compute("a", compute("a")) == {"key": "a"}
+
+    assert compute.calls == ["a"]
+    stats = restarted.stats()
+    assert (stats["hits"], stats["misses"], stats["shared"]["hits"]) == (1, 1, 1)
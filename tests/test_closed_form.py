@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.core import phaseout_no_offset_closed_form, project_phaseout
+from backend.models import ProjectionRequest
+from backend.projection import summarise_projection
+
+
+def check(max_t, L, P0, g, r_avg, K0, si, S0):
+    total_premium, final_balance = phaseout_no_offset_closed_form(max_t, L, P0, g, r_avg, K0, si, S0)
+    result = project_phaseout(max_t, L, P0, g, r_avg, K0, si, S0, alpha=0.0)
+    assert total_premium == pytest.approx(result.total("Baseline Premium"), rel=1e-10, abs=1e-6)
+    assert final_balance == pytest.approx(result.final_balance, rel=1e-10, abs=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_iterative_loop(seed):
+    rng = np.random.default_rng(seed)
+    check(
+        max_t=int(rng.integers(0, 65)),
+        L=float(rng.choice([0.0, rng.uniform(1, 2_000_000)])),
+        P0=float(rng.uniform(0, 10_000)),
+        g=float(rng.uniform(-0.1, 0.1)),
+        r_avg=float(rng.uniform(-0.5, 0.2)),
+        K0=float(rng.uniform(0, 1_000_000)),
+        si=float(rng.uniform(-0.1, 0.1)),
+        S0=float(rng.uniform(0, 20_000)),
+    )
+
+
+@pytest.mark.parametrize("case", [
+    dict(r_avg=0.05, si=0.05),            # contribution growth equals the return
+    dict(r_avg=0.05, g=0.05, L=0.0),      # reinvested premium growth equals the return
+    dict(g=0.0),
+    dict(g=0.0, si=0.0, r_avg=0.0),
+    dict(L=0.0),
+    dict(r_avg=-0.04, g=-0.02, si=-0.01),
+    dict(max_t=0),
+])
+def test_edge_cases(case):
+    check(**dict(dict(max_t=44, L=500_000.0, P0=1_800.0, g=0.03, r_avg=0.05011, K0=100_000.0, si=0.03, S0=2_400.0), **case))
+
+
+def test_no_cover_summary_is_exactly_zero():
+    summary = summarise_projection(ProjectionRequest(
+        current_age=30, life_cover=0, premium=1_800, kiwisaver_balance=100_000, salary=80_000, kiwisaver_rate=0.03
+    ))
+    assert summary["kiwisaver_increase"] == 0
+    assert summary["kiwisaver_increase_pct"] == 0.0
+    assert math.copysign(1.0, summary["kiwisaver_increase_pct"]) == 1.0
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from backend.core import PERIOD_COLUMNS, period_detail, project_phaseout, project_total_wealth
+
+
+def compound_year(K, contribution, r_avg, periods):
+    """One year paid and compounded period by period: (per-period rows, year-end balance)."""
+    i = (1.0 + r_avg) ** (1.0 / periods) - 1.0
+    rows = []
+    for k in range(periods):
+        start = K
+        K = K * (1.0 + i) + contribution / periods
+        rows.append((k + 1, start, contribution / periods, K - start - contribution / periods, K))
+    return rows, K
+
+
+def phaseout_loop(max_t, L, P0, g, r_avg, K0, si, S0, alpha, periods):
+    """Phase-out model stepped one period at a time: (annual columns, per-period rows)."""
+    annual, detail = {"KiwiSaver Start Balance": [], "Premium w/ Offset": [], "Voluntary Contribution": [],
+                      "Annual Salary Contribution": [], "Annual Investment Return": [], "KiwiSaver End Balance": []}, []
+    K = K0
+    for t in range(max_t + 1):
+        Pt = P0 * (1.0 + g) ** t
+        cover = max(0.0, L - min(alpha * K, L))
+        premium = Pt * cover / L if L > 0 else 0.0
+        V, S = Pt - premium, S0 * (1.0 + si) ** t
+        rows, K_end = compound_year(K, S + V, r_avg, periods)
+        detail += [(t + 1, k, start, premium / periods, c, ret, end) for k, start, c, ret, end in rows]
+        for name, value in zip(annual, (K, premium, V, S, K_end - K - S - V, K_end)):
+            annual[name].append(value)
+        K = K_end
+    return annual, detail
+
+
+def total_wealth_loop(inputs, responsibilities, periods):
+    """Total-wealth model stepped one period at a time, with each year's responsibilities given."""
+    annual, detail = {"KiwiSaver Start Balance": [], "Required Cover": [], "Premium w/ Offset": [],
+                      "Voluntary Contribution": [], "Annual Salary Contribution": [],
+                      "Annual Investment Return": [], "KiwiSaver End Balance": []}, []
+    K = inputs["K0"]
+    assets = inputs["property_value"] + inputs["cash"] + inputs["managed_funds"] + inputs["other_assets"]
+    debt = inputs["liabilities"]
+    fixed = inputs["funeral_cost"] + inputs["holding_amount"]
+    required_prev = None
+    for t in range(inputs["max_t"] + 1):
+        required = max(0.0, debt + responsibilities[t] + fixed - (K + assets))
+        Pt = inputs["P0"] * (1 + inputs["g"]) ** t
+        if t == 0:
+            premium = Pt
+        elif required_prev == 0:
+            premium = 0.0
+        else:
+            premium = Pt * required / required_prev
+        V, S = Pt - premium, inputs["S0"] * (1 + inputs["si"]) ** t
+        rows, K_end = compound_year(K, S + V, inputs["r_avg"], periods)
+        detail += [(t + 1, k, start, premium / periods, c, ret, end) for k, start, c, ret, end in rows]
+        for name, value in zip(annual, (K, required, premium, V, S, K_end - K - S - V, K_end)):
+            annual[name].append(value)
+        K, required_prev = K_end, required
+        assets *= 1 + inputs["asset_growth_rate"]
+        debt *= 1 - inputs["debt_shrink_rate"]
+    return annual, detail
+
+
+def assert_matches(result, annual, detail, r_avg, periods):
+    for name, values in annual.items():
+        np.testing.assert_allclose(result[name], values, rtol=1e-9, atol=1e-6, err_msg=name)
+    expanded = period_detail(result, r_avg, periods)
+    assert len(expanded) == len(detail)
+    for row, name in enumerate(PERIOD_COLUMNS):
+        np.testing.assert_allclose(expanded[name], [d[row] for d in detail], rtol=1e-9, atol=1e-6, err_msg=name)
+    # Each year's last period ends on the annual balance
+    np.testing.assert_allclose(expanded["KiwiSaver End Balance"][periods - 1::periods],
+                               result["KiwiSaver End Balance"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("periods", [12, 26, 52])
+@pytest.mark.parametrize("seed", range(10))
+def test_phaseout_matches_per_period_loop(periods, seed):
+    rng = np.random.default_rng(seed)
+    inputs = dict(
+        max_t=int(rng.integers(0, 45)),
+        L=float(rng.choice([0.0, rng.uniform(1, 1_500_000)])),
+        P0=float(rng.uniform(0, 5_000)),
+        g=float(rng.uniform(-0.02, 0.08)),
+        r_avg=float(rng.choice([0.0, rng.uniform(-0.3, 0.15)])),
+        K0=float(rng.uniform(0, 300_000)),
+        si=float(rng.uniform(-0.02, 0.08)),
+        S0=float(rng.uniform(0, 15_000)),
+        alpha=float(rng.choice([0.0, 1.0])),
+    )
+    result = project_phaseout(**inputs, periods=periods)
+    annual, detail = phaseout_loop(**inputs, periods=periods)
+    assert_matches(result, annual, detail, inputs["r_avg"], periods)
+    assert result.full_cover_t == next(
+        (t + 1 for t, K in enumerate(annual["KiwiSaver End Balance"]) if K >= inputs["L"]), None
+    )
+
+
+@pytest.mark.parametrize("periods", [12, 26, 52])
+@pytest.mark.parametrize("seed", range(10))
+def test_total_wealth_matches_per_period_loop(periods, seed):
+    rng = np.random.default_rng(seed)
+    inputs = dict(
+        max_t=int(rng.integers(0, 45)),
+        P0=float(rng.uniform(0, 5_000)),
+        g=float(rng.uniform(-0.02, 0.08)),
+        r_avg=float(rng.choice([0.0, rng.uniform(-0.3, 0.15)])),
+        K0=float(rng.uniform(0, 300_000)),
+        si=float(rng.uniform(-0.02, 0.08)),
+        S0=float(rng.uniform(0, 15_000)),
+        property_value=float(rng.uniform(0, 1_000_000)),
+        cash=float(rng.uniform(0, 50_000)),
+        managed_funds=float(rng.uniform(0, 100_000)),
+        other_assets=float(rng.uniform(0, 30_000)),
+        liabilities=float(rng.uniform(0, 1_000_000)),
+        child_ages=[int(a) for a in rng.integers(0, 18, rng.integers(0, 3))],
+        asset_growth_rate=float(rng.uniform(0, 0.06)),
+        debt_shrink_rate=float(rng.uniform(0, 0.1)),
+        holding_amount=float(rng.uniform(0, 200_000)),
+        funeral_cost=float(rng.uniform(0, 20_000)),
+    )
+    result = project_total_wealth(**inputs, periods=periods)
+    # Responsibilities, assets and debt don't depend on the compounding
+    annual_model = project_total_wealth(**inputs)
+    for name in ("Total Assets Start", "Total Liabilities Start", "Responsibilities Start", "Total Assets"):
+        np.testing.assert_array_equal(result[name], annual_model[name])
+    responsibilities = list(annual_model["Responsibilities Start"])
+
+    annual, detail = total_wealth_loop(inputs, responsibilities, periods)
+    assert_matches(result, annual, detail, inputs["r_avg"], periods)
+
+
+def test_one_period_is_end_of_year_contributions():
+    # periods=1: the whole year's contributions arrive at year end and earn nothing
+    result = project_phaseout(max_t=10, L=500_000, P0=2_000, g=0.03, r_avg=0.06, K0=50_000, si=0.03, S0=4_000, periods=1)
+    np.testing.assert_allclose(result["Annual Investment Return"], 0.06 * result["KiwiSaver Start Balance"], rtol=1e-12)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from backend.core import TOTAL_WEALTH_COLUMNS, project_total_wealth
+from backend.household import MEMBER_COLUMNS, project_household
+
+
+def random_household(rng):
+    return dict(
+        g=float(rng.uniform(-0.05, 0.1)),
+        si=float(rng.uniform(-0.05, 0.1)),
+        property_value=float(rng.uniform(0, 1_500_000)),
+        cash=float(rng.uniform(0, 50_000)),
+        managed_funds=float(rng.uniform(0, 100_000)),
+        other_assets=float(rng.uniform(0, 30_000)),
+        liabilities=float(rng.uniform(0, 1_000_000)),
+        child_ages=[int(a) for a in rng.integers(0, 18, rng.integers(0, 4))],
+        asset_growth_rate=float(rng.uniform(-0.02, 0.06)),
+        debt_shrink_rate=float(rng.uniform(0, 0.1)),
+        # Non-round amounts, where a different addition order changes the last bits
+        holding_amount=float(rng.uniform(0, 100_000)),
+        funeral_cost=float(rng.uniform(0, 20_000)),
+    )
+
+
+def random_member(rng):
+    return dict(
+        max_t=int(rng.integers(0, 50)),
+        P0=float(rng.uniform(0, 5_000)),
+        r_avg=float(rng.uniform(-0.02, 0.08)),
+        K0=float(rng.uniform(0, 300_000)),
+        S0=float(rng.uniform(0, 15_000)),
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_one_member_is_bit_identical_to_single_model(seed):
+    rng = np.random.default_rng(seed)
+    shared, member = random_household(rng), random_member(rng)
+    single = project_total_wealth(**member, **shared)
+    household = project_household(**{k: [v] for k, v in member.items()}, **shared).household
+
+    for name in TOTAL_WEALTH_COLUMNS:
+        assert np.array_equal(household[name], single[name]), name
+    assert household.full_cover_t == single.full_cover_t
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_household_columns_are_member_sums(seed):
+    rng = np.random.default_rng(seed)
+    members = [random_member(rng) for _ in range(3)]
+    projection = project_household(**{k: [m[k] for m in members] for k in members[0]}, **random_household(rng))
+
+    assert len(projection.household) == max(m["max_t"] for m in members) + 1
+    for name in MEMBER_COLUMNS[1:]:
+        total = sum(member[name] for member in projection.members)
+        np.testing.assert_allclose(projection.household[name], total, rtol=1e-12, atol=1e-9)
+
+    for member, result in zip(members, projection.members):
+        past = slice(member["max_t"] + 1, None)
+        assert not result["Baseline Premium"][past].any()
+        assert not result["Annual Salary Contribution"][past].any()
+        assert not result["Voluntary Contribution"][past].any()
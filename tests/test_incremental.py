@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from backend.core import project_phaseout, project_total_wealth
+from backend.incremental import first_changed_year, resume_phaseout, resume_total_wealth
+
+STEPS = 50
+
+
+def random_phaseout(rng):
+    return dict(
+        max_t=int(rng.integers(0, 50)),
+        L=float(rng.choice([0.0, rng.uniform(1, 1_500_000)])),
+        P0=float(rng.uniform(0, 5_000)),
+        g=float(rng.uniform(-0.02, 0.08)),
+        r_avg=float(rng.uniform(-0.1, 0.12)),
+        K0=float(rng.uniform(0, 300_000)),
+        si=float(rng.uniform(-0.02, 0.08)),
+        S0=float(rng.uniform(0, 15_000)),
+        alpha=float(rng.choice([0.0, 1.0])),
+        periods=rng.choice([None, 12, 26, 52]),
+    )
+
+
+def random_total_wealth(rng):
+    return dict(
+        max_t=int(rng.integers(0, 50)),
+        P0=float(rng.uniform(0, 5_000)),
+        g=float(rng.uniform(-0.02, 0.08)),
+        r_avg=float(rng.uniform(-0.1, 0.12)),
+        K0=float(rng.uniform(0, 300_000)),
+        si=float(rng.uniform(-0.02, 0.08)),
+        S0=float(rng.uniform(0, 15_000)),
+        property_value=float(rng.uniform(0, 1_000_000)),
+        cash=float(rng.uniform(0, 50_000)),
+        managed_funds=float(rng.uniform(0, 100_000)),
+        other_assets=float(rng.uniform(0, 30_000)),
+        liabilities=float(rng.uniform(0, 1_000_000)),
+        child_ages=[int(a) for a in rng.integers(0, 25, rng.integers(0, 4))],
+        asset_growth_rate=float(rng.uniform(0, 0.06)),
+        debt_shrink_rate=float(rng.uniform(0, 0.1)),
+        holding_amount=float(rng.uniform(0, 200_000)),
+        funeral_cost=float(rng.uniform(0, 20_000)),
+        periods=rng.choice([None, 12, 26, 52]),
+    )
+
+
+def edit(rng, inputs, fresh):
+    """A session-like change: mostly the horizon or children, sometimes any other input."""
+    inputs = dict(inputs)
+    kind = rng.integers(0, 4)
+    if kind == 0:
+        inputs["max_t"] = fresh["max_t"]
+    elif kind == 1 and "child_ages" in inputs:
+        ages = list(inputs["child_ages"])
+        if ages and rng.random() < 0.5:
+            ages.pop(int(rng.integers(0, len(ages))))
+        else:
+            ages.append(int(rng.integers(0, 25)))
+        inputs["child_ages"] = ages
+    elif kind == 2:
+        name = str(rng.choice(list(fresh)))
+        inputs[name] = fresh[name]
+    return inputs   # kind 3: unchanged
+
+
+def assert_identical(resumed, full):
+    assert resumed.columns == full.columns
+    assert np.array_equal(resumed.values, full.values)
+    assert resumed.full_cover_t == full.full_cover_t
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_resume_phaseout_is_bit_identical(seed):
+    rng = np.random.default_rng(seed)
+    inputs = random_phaseout(rng)
+    previous = project_phaseout(**inputs)
+    for _ in range(STEPS):
+        new_inputs = edit(rng, inputs, random_phaseout(rng))
+        resumed = resume_phaseout(previous, inputs, **new_inputs)
+        assert_identical(resumed, project_phaseout(**new_inputs))
+        inputs, previous = new_inputs, resumed
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_resume_total_wealth_is_bit_identical(seed):
+    rng = np.random.default_rng(seed)
+    inputs = random_total_wealth(rng)
+    previous = project_total_wealth(**inputs)
+    resumed_from_later_year = 0
+    for _ in range(STEPS):
+        new_inputs = edit(rng, inputs, random_total_wealth(rng))
+        resumed_from_later_year += first_changed_year(inputs, new_inputs) > 0
+        resumed = resume_total_wealth(previous, inputs, **new_inputs)
+        assert_identical(resumed, project_total_wealth(**new_inputs))
+        inputs, previous = new_inputs, resumed
+    # The resume path itself is exercised, not only full recomputes
+    assert resumed_from_later_year > 0
+
+
+def test_first_changed_year():
+    base = dict(max_t=30, P0=1_000.0, child_ages=[10])
+    assert first_changed_year(base, dict(base, max_t=40)) == 31
+    assert first_changed_year(base, dict(base, max_t=20)) == 21
+    assert first_changed_year(base, dict(base, P0=1_001.0)) == 0
+    assert first_changed_year(base, base) == 31
+    # Responsibilities are what remains to be paid, so any child still in a band changes year 0
+    assert first_changed_year(base, dict(base, child_ages=[10, 17])) == 0
+    assert first_changed_year(base, dict(base, child_ages=[12])) == 0
+    # An 18-year-old adds none, so nothing changes
+    assert first_changed_year(base, dict(base, child_ages=[10, 18])) == 31
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import api, instrumentation
+
+MONTECARLO = {"current_age": 40, "life_cover": 500000, "premium": 2000, "kiwisaver_balance": 60000,
+              "salary": 90000, "kiwisaver_rate": 0.06, "n_paths": 200, "seed": 1}
+TOTAL_WEALTH = {"current_age": 40, "life_cover": 500000, "premium": 2000, "kiwisaver_balance": 60000,
+                "salary": 90000, "kiwisaver_rate": 0.06, "liabilities": 400000, "property_value": 300000}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(instrumentation, "PROFILING", True)
+    monkeypatch.setattr(instrumentation, "PROFILE_DIR", str(tmp_path))
+    app = FastAPI()
+    app.middleware("http")(instrumentation.timing_middleware)
+    app.post("/calculate/montecarlo")(api.calculate_montecarlo)
+    app.post("/calculate/total-wealth")(api.calculate_total_wealth)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path, body, functions", [
+    ("/calculate/montecarlo", MONTECARLO, ["simulate_phaseout", "calculator_phaseout_batch"]),
+    ("/calculate/total-wealth", TOTAL_WEALTH, ["project_total_wealth", "_total_wealth_steps"]),
+])
+def test_profile_covers_work_sent_off_the_event_loop(client, path, body, functions):
+    # Unprofiled first, so lazy imports don't crowd the calculator out of the report's top entries
+    client.post(path, json=body)
+    response = client.post(path, json=body, headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    with open(response.headers["X-Profile-Report"]) as f:
+        report = f.read()
+    for function in functions:
+        assert function in report
+    assert "epoll" not in report
+
+
+def test_no_profile_without_header(client):
+    response = client.post("/calculate/montecarlo", json=MONTECARLO)
+    assert response.status_code == 200
+    assert "X-Profile-Report" not in response.headers
@@ -0,0 +1,27 @@
+import numpy as np
+
+from backend.core import PERIOD_COLUMNS, PHASEOUT_COLUMNS, project_phaseout
+from backend.result import ProjectionResult
+
+INPUTS = dict(max_t=45, L=500_000, P0=2_000, g=0.03, r_avg=0.05, K0=50_000, si=0.03, S0=4_000)
+
+
+def test_results_share_one_column_layout():
+    a, b = project_phaseout(**INPUTS), project_phaseout(**dict(INPUTS, max_t=10))
+    assert a.columns is b.columns
+    assert a._index is b._index
+    assert a.columns == tuple(PHASEOUT_COLUMNS)
+
+    other = ProjectionResult(PERIOD_COLUMNS, 3)
+    assert other.columns is not a.columns
+    assert other.columns == tuple(PERIOD_COLUMNS)
+
+
+def test_columns_by_name():
+    result = project_phaseout(**INPUTS)
+    assert len(result) == 46
+    for row, name in enumerate(PHASEOUT_COLUMNS):
+        assert np.shares_memory(result[name], result.values)
+        np.testing.assert_array_equal(result[name], result.values[row])
+    assert list(result.to_dict()) == PHASEOUT_COLUMNS
+    assert result.final_balance == result.values[-1, -1]
@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.core import project_phaseout
+from backend.solver import SOLVABLE, UPPER_LIMITS, brentq, solve_phaseout
+
+
+def balance_in_year(solve_for, value, inputs, year):
+    """KiwiSaver end balance in `year` with the solved input set to value, from the reference model."""
+    params = {"kiwisaver_rate": inputs["kiwisaver_rate"], "kiwisaver_balance": inputs["K0"], "premium": inputs["P0"],
+              solve_for: value}
+    result = project_phaseout(inputs["max_t"], inputs["L"], params["premium"], inputs["g"], inputs["r_avg"],
+                              params["kiwisaver_balance"], inputs["si"], inputs["salary"] * params["kiwisaver_rate"],
+                              inputs["alpha"])
+    return result["KiwiSaver End Balance"][year - 1]
+
+
+def random_inputs(rng):
+    return dict(
+        max_t=int(rng.integers(5, 45)),
+        L=float(rng.uniform(100_000, 2_000_000)),
+        P0=float(rng.uniform(500, 5_000)),
+        g=float(rng.uniform(0, 0.06)),
+        r_avg=float(rng.uniform(0, 0.1)),
+        K0=float(rng.uniform(0, 50_000)),
+        si=float(rng.uniform(0, 0.05)),
+        salary=float(rng.uniform(30_000, 150_000)),
+        kiwisaver_rate=float(rng.choice([0.03, 0.06, 0.1])),
+        alpha=float(rng.choice([0.0, 1.0])),
+    )
+
+
+@pytest.mark.parametrize("solve_for", SOLVABLE)
+@pytest.mark.parametrize("target", ["age", "balance"])
+@pytest.mark.parametrize("seed", range(15))
+def test_answer_is_the_smallest_that_reaches_the_target(solve_for, target, seed):
+    rng = np.random.default_rng(seed)
+    inputs = random_inputs(rng)
+    if target == "age":
+        kwargs = dict(target_t=int(rng.integers(1, inputs["max_t"] + 1)))
+        year, goal = kwargs["target_t"], inputs["L"]
+    else:
+        kwargs = dict(target_balance=float(rng.uniform(50_000, 3_000_000)))
+        year, goal = inputs["max_t"] + 1, kwargs["target_balance"]
+
+    result = solve_phaseout(solve_for, **inputs, **kwargs)
+    if not result.feasible:
+        # Only when even the largest value tried falls short
+        assert result.value is None
+        assert balance_in_year(solve_for, UPPER_LIMITS[solve_for], inputs, year) < goal
+        return
+
+    decimals = 6 if solve_for == "kiwisaver_rate" else 2
+    assert result.value == round(result.value, decimals)
+    assert balance_in_year(solve_for, result.value, inputs, year) >= goal
+    if result.value > 0:
+        assert balance_in_year(solve_for, round(result.value - 10.0**-decimals, decimals), inputs, year) < goal
+
+
+@pytest.mark.parametrize("solve_for", SOLVABLE)
+def test_target_already_met(solve_for):
+    # Met by the balance alone, or by a year of salary contributions when solving for the balance
+    result = solve_phaseout(solve_for, max_t=30, L=100_000, P0=1_000, g=0.03, r_avg=0.05, K0=150_000, si=0.03,
+                            salary=5_000_000, kiwisaver_rate=0.03, target_t=1)
+    assert result == (0.0, 1, True)
+
+
+@pytest.mark.parametrize("solve_for", SOLVABLE)
+def test_unreachable_target(solve_for):
+    result = solve_phaseout(solve_for, max_t=30, L=100_000, P0=1_000, g=0.03, r_avg=0.05, K0=0, si=0.03,
+                            salary=80_000, kiwisaver_rate=0.03, target_balance=1e15)
+    assert result.value is None
+    assert not result.feasible
+
+
+def test_invalid_arguments():
+    base = dict(max_t=30, L=100_000, P0=1_000, g=0.03, r_avg=0.05, K0=0, si=0.03, salary=80_000, kiwisaver_rate=0.03)
+    with pytest.raises(ValueError):
+        solve_phaseout("salary", **base, target_t=10)
+    with pytest.raises(ValueError):
+        solve_phaseout("premium", **base)
+    with pytest.raises(ValueError):
+        solve_phaseout("premium", **base, target_t=10, target_balance=1.0)
+
+
+@pytest.mark.parametrize("f, a, b, root", [
+    (lambda x: x**3 - 2, 0.0, 4.0, 2 ** (1 / 3)),
+    (math.cos, 0.0, 3.0, math.pi / 2),
+    (lambda x: math.exp(x) - 1e6, 0.0, 50.0, math.log(1e6)),
+    # Flat then steep: forces bisection steps
+    (lambda x: -1.0 if x < 0.7 else 1e9 * (x - 0.7) - 1.0, 0.0, 1.0, 0.7 + 1e-9),
+])
+def test_brentq(f, a, b, root):
+    x = brentq(f, a, b, f(a), f(b), xtol=1e-10)
+    assert x == pytest.approx(root, abs=1e-9)
+
+
+def test_brentq_endpoint_roots():
+    assert brentq(lambda x: x, 0.0, 1.0, 0.0, 1.0) == 0.0
+    assert brentq(lambda x: x - 1, 0.0, 1.0, -1.0, 0.0) == 1.0
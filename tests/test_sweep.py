@@ -0,0 +1,38 @@
+import csv
+
+import pytest
+
+from backend.sweep import RESULT_COLUMNS, run_sweep
+
+# The first chunk holds only the integer 0 for asset_growth_rate, and max_t is an integer parameter
+GRID = {"asset_growth_rate": [0, 0.02, 0.05], "g": [0.03, 0.05], "max_t": [20, 30]}
+
+
+def test_parquet_types_are_pinned_from_the_first_chunk(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "sweep.parquet")
+    stats = run_sweep(GRID, path, workers=1, chunk_size=2, progress=False)
+    assert stats["cells"] == 12
+
+    table = pq.read_table(path).sort_by("cell")
+    assert table.schema.field("asset_growth_rate").type == pa.float64()
+    assert table.schema.field("g").type == pa.float64()
+    assert table.schema.field("max_t").type == pa.int64()
+    assert table.schema.field("full_cover_t").type == pa.int64()
+    assert table.column("asset_growth_rate").to_pylist() == [0.0] * 4 + [0.02] * 4 + [0.05] * 4
+
+
+def test_csv_matches_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    run_sweep(GRID, str(tmp_path / "sweep.parquet"), workers=1, chunk_size=2, progress=False)
+    run_sweep(GRID, str(tmp_path / "sweep.csv"), workers=1, chunk_size=2, progress=False)
+
+    parquet_rows = sorted(pq.read_table(str(tmp_path / "sweep.parquet")).to_pylist(), key=lambda row: row["cell"])
+    with open(tmp_path / "sweep.csv", newline="") as f:
+        csv_rows = sorted(csv.DictReader(f), key=lambda row: int(row["cell"]))
+    assert len(csv_rows) == len(parquet_rows) == 12
+    for csv_row, parquet_row in zip(csv_rows, parquet_rows):
+        for name in ["asset_growth_rate", "g", *RESULT_COLUMNS]:
+            expected = parquet_row[name]
+            assert (csv_row[name] == "") if expected is None else float(csv_row[name]) == expected
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from backend.calculator import PHASEOUT_COLUMNS, calculator_phaseout
+from backend.vectorized import calculator_phaseout_batch
+
+RTOL = 1e-12
+
+
+def random_scenarios(rng, n):
+    return dict(
+        max_t=rng.integers(0, 48, n),
+        L=np.where(rng.random(n) < 0.15, 0.0, rng.uniform(50_000, 2_000_000, n)),
+        P0=rng.uniform(0, 8_000, n),
+        g=rng.uniform(-0.02, 0.08, n),
+        r_avg=rng.uniform(-0.05, 0.12, n),
+        K0=rng.uniform(0, 800_000, n),
+        si=rng.uniform(-0.01, 0.06, n),
+        S0=rng.uniform(0, 12_000, n),
+        alpha=rng.choice([0.0, 0.5, 1.0, 1.5], n),
+    )
+
+
+def scenario(params, i):
+    return {name: (int(values[i]) if name == "max_t" else float(values[i])) for name, values in params.items()}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_calculator_phaseout(seed):
+    params = random_scenarios(np.random.default_rng(seed), 60)
+    out, full_cover_t = calculator_phaseout_batch(**params)
+    n_years = int(params["max_t"].max()) + 1
+
+    for i in range(60):
+        df, expected_cover_t = calculator_phaseout(**scenario(params, i))
+        rows = len(df)
+        for col in PHASEOUT_COLUMNS:
+            assert out[col].shape == (60, n_years)
+            np.testing.assert_allclose(out[col][i, :rows], df[col].to_numpy(dtype=float), rtol=RTOL, atol=1e-9, err_msg=col)
+            # Past the scenario's own horizon every column is masked
+            assert np.isnan(out[col][i, rows:]).all(), col
+        if expected_cover_t is None:
+            assert np.isnan(full_cover_t[i])
+        else:
+            assert full_cover_t[i] == expected_cover_t
+
+
+def test_no_cover():
+    params = dict(max_t=30, L=0.0, P0=1_800.0, g=0.03, r_avg=0.05, K0=10_000.0, si=0.03, S0=2_400.0)
+    out, full_cover_t = calculator_phaseout_batch(**params)
+    df, expected_cover_t = calculator_phaseout(**params)
+
+    # Without cover nothing is paid with the offset, so the whole premium is reinvested
+    assert (out["Premium w/ Offset"][0] == 0.0).all()
+    np.testing.assert_allclose(out["KiwiSaver End Balance"][0], df["KiwiSaver End Balance"], rtol=RTOL)
+    assert full_cover_t[0] == expected_cover_t == 1
+
+
+def test_per_year_returns_constant_rows_match_scalar():
+    params = random_scenarios(np.random.default_rng(10), 40)
+    n_years = int(params["max_t"].max()) + 1
+    returns = np.repeat(params["r_avg"][:, None], n_years, axis=1)
+
+    out_2d, cover_2d = calculator_phaseout_batch(**dict(params, r_avg=returns))
+    out_1d, cover_1d = calculator_phaseout_batch(**params)
+    for col in PHASEOUT_COLUMNS:
+        np.testing.assert_array_equal(out_2d[col], out_1d[col], err_msg=col)
+    np.testing.assert_array_equal(cover_2d, cover_1d)
+
+
+def test_per_year_returns_match_chained_single_years():
+    rng = np.random.default_rng(11)
+    max_t, L, P0, g, K0, si, S0 = 25, 400_000.0, 2_000.0, 0.03, 50_000.0, 0.03, 3_000.0
+    returns = rng.normal(0.05, 0.1, size=(3, max_t + 1))
+    out, full_cover_t = calculator_phaseout_batch(max_t, L, P0, g, returns, K0, si, S0)
+
+    for path in range(3):
+        # Year t alone is the single-year model started from year t's balance, premium and salary
+        Kt, expected_cover_t = K0, None
+        for t in range(max_t + 1):
+            df, _ = calculator_phaseout(0, L, P0 * (1 + g)**t, g, returns[path, t], Kt, si, S0 * (1 + si)**t)
+            Kt = df["KiwiSaver End Balance"].iloc[0]
+            np.testing.assert_allclose(out["KiwiSaver End Balance"][path, t], Kt, rtol=RTOL)
+            if expected_cover_t is None and Kt >= L:
+                expected_cover_t = t + 1
+        if expected_cover_t is None:
+            assert np.isnan(full_cover_t[path])
+        else:
+            assert full_cover_t[path] == expected_cover_t
+
+
+def test_per_year_returns_too_short():
+    with pytest.raises(ValueError):
+        calculator_phaseout_batch(10, 1.0, 1.0, 0.0, np.zeros((2, 5)), 0.0, 0.0, 0.0)
+
+
+def test_column_subset():
+    params = random_scenarios(np.random.default_rng(12), 30)
+    full, full_cover_t = calculator_phaseout_batch(**params)
+    subset, subset_cover_t = calculator_phaseout_batch(**params, columns=["Premium w/ Offset", "KiwiSaver End Balance"])
+
+    assert list(subset) == ["Premium w/ Offset", "KiwiSaver End Balance"]
+    for col in subset:
+        np.testing.assert_array_equal(subset[col], full[col])
+    np.testing.assert_array_equal(subset_cover_t, full_cover_t)
+
+    with pytest.raises(ValueError):
+        calculator_phaseout_batch(**params, columns=["Not A Column"])